@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react';
+import { authApi } from '@/lib/auth-api';
 
 export interface UsernameValidationResult {
   username: string;
@@ -10,6 +11,7 @@ export interface UsernameValidationResult {
 export const useUsernameValidation = (initialUsername: string = '') => {
   const [username, setUsername] = useState(initialUsername);
   const [isValid, setIsValid] = useState<boolean | null>(null);
+  const [isAvailable, setIsAvailable] = useState<boolean | null>(null);
 
   const validateUsername = (username: string): boolean => {
     const usernameRegex = /^[a-zA-Z0-9_]{3,20}$/;
@@ -24,22 +26,53 @@ export const useUsernameValidation = (initialUsername: string = '') => {
     }
   }, [username]);
 
+  useEffect(() => {
+    setIsAvailable(null);
+    if (!username || !validateUsername(username)) {
+      return;
+    }
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const result = await authApi.checkUsernameAvailable(username);
+        if (!cancelled) {
+          setIsAvailable(result.available);
+        }
+      } catch {
+        if (!cancelled) {
+          setIsAvailable(null);
+        }
+      }
+    }, 300);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [username]);
+
   const inputClassName = `w-full px-4 py-3 border rounded-lg shadow-sm focus:outline-none focus:ring-2 transition-all duration-200 bg-white/50 backdrop-blur-sm ${
-    username && isValid === false
+    username && (isValid === false || isAvailable === false)
       ? 'border-red-300 focus:ring-red-500 focus:border-red-500'
       : username && isValid === true
       ? 'border-green-300 focus:ring-green-500 focus:border-green-500'
       : 'border-gray-300 focus:ring-purple-500 focus:border-transparent'
   }`;
 
-  const errorMessage = username && isValid === false ? 'Username must be 3-20 characters, letters, numbers, and underscores only' : null;
+  const errorMessage = username && isValid === false
+    ? 'Username must be 3-20 characters, letters, numbers, and underscores only'
+    : username && isAvailable === false
+    ? 'This username is already taken'
+    : null;
 
   return {
     username,
     setUsername,
     isValid,
+    isAvailable,
     inputClassName,
     errorMessage,
-    validateUsername: () => validateUsername(username),
+    validateUsername: () => validateUsername(username) && isAvailable !== false,
   };
 };
\ No newline at end of file
@@ -24,6 +24,7 @@ export default function Chatbot() {
     },
   ]);
   const [inputValue, setInputValue] = useState('');
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const [isTyping, setIsTyping] = useState(false);
   const [availableDomains, setAvailableDomains] = useState<string[]>(AVAILABLE_DOMAINS);
   const [showSettings, setShowSettings] = useState(false);
@@ -86,6 +87,7 @@ export default function Chatbot() {
         },
         body: JSON.stringify({
           message: userMessage.content,
+          session_id: sessionId,
           conversation_history: conversationHistory,
           model: "claude-3-5-haiku-20241022",
           temperature: temperature,
@@ -105,6 +107,9 @@ export default function Chatbot() {
       }
 
       const data = await response.json();
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
 
       const botMessage: Message = {
         id: (Date.now() + 1).toString(),
@@ -234,6 +234,28 @@ export const authApi = {
     return response.json();
   },
 
+  async checkUsernameAvailable(username: string): Promise<{ username: string; available: boolean }> {
+    const response = await fetch(`${API_BASE_URL}/auth/username-available?username=${encodeURIComponent(username)}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    });
+
+    if (!response.ok) {
+      const errorData: AuthError = await response.json();
+      const error = errorData.detail?.error || errorData.error;
+      const userFriendlyMessage = error?.message ? getUserFriendlyErrorMessage(error.message) : 'Failed to check username';
+      throw new ApiError(
+        userFriendlyMessage,
+        error?.code || response.status,
+        error || errorData
+      );
+    }
+
+    return response.json();
+  },
+
   async getDomains(): Promise<{ domains: Array<{ id: string; name: string; description: string }> }> {
     const response = await fetch(`${API_BASE_URL}/auth/domains`, {
       method: 'GET',
@@ -0,0 +1,98 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.config import Config
+
+DESCENDING = "DESCENDING"
+ASCENDING = "ASCENDING"
+
+
+def create_firestore_client():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    if not firebase_admin._apps:
+        if Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH and os.path.exists(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH):
+            cred = credentials.Certificate(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH)
+        else:
+            cred = credentials.ApplicationDefault()
+
+        firebase_admin.initialize_app(cred, {
+            'projectId': Config.FIREBASE_PROJECT_ID
+        })
+
+    return firestore.client()
+
+
+def create_anthropic_client():
+    import anthropic
+
+    return anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+
+
+class Clients:
+    """Process-wide clients and services, created on first use.
+
+    The app lifespan creates them eagerly (and concurrently) at startup, but
+    nothing is built at import time, so importing ``app.main`` needs neither
+    credentials nor the heavy client libraries. Each name has its own build
+    lock, so a slow factory (a model load) only blocks callers of that name.
+    ``override`` swaps in local stand-ins, e.g. for tests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {
+            'firestore': create_firestore_client,
+            'anthropic': create_anthropic_client,
+        }
+        self._instances: Dict[str, Any] = {}
+
+    def get(self, name: str, factory: Optional[Callable[[], Any]] = None) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = (factory or self._factories[name])()
+                with self._lock:
+                    self._instances[name] = instance
+            return instance
+
+    def firestore(self):
+        return self.get('firestore')
+
+    def anthropic(self):
+        return self.get('anthropic')
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    def override(self, **instances):
+        """Replace clients (e.g. ``firestore=FakeFirestore()``) and drop every service built on the old ones"""
+        with self._lock:
+            self._instances = {name: value for name, value in self._instances.items() if name in self._factories}
+            self._instances.update(instances)
+
+    def close(self):
+        with self._lock:
+            instances, self._instances = self._instances, {}
+        for instance in instances.values():
+            close = getattr(instance, 'close', None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+clients = Clients()
+
+
+def get_db():
+    return clients.firestore()
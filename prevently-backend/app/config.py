@@ -8,4 +8,23 @@ class Config:
     FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
     FIREBASE_SERVICE_ACCOUNT_KEY_PATH = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY_PATH")
     CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
-    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
\ No newline at end of file
+    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+    NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+    ALERT_Z_THRESHOLD = float(os.getenv("ALERT_Z_THRESHOLD", "2.5"))
+    ALERT_EWMA_ALPHA = float(os.getenv("ALERT_EWMA_ALPHA", "0.1"))
+    ALERT_SUBLABELS = os.getenv("ALERT_SUBLABELS", "Panic,Risk").split(",")
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+    CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+    EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", "data/embeddings")
+    EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "nlptown/bert-base-multilingual-uncased-sentiment")
+    SENTIMENT_MAX_BATCH_SIZE = int(os.getenv("SENTIMENT_MAX_BATCH_SIZE", "32"))
+    SENTIMENT_MAX_WAIT_MS = float(os.getenv("SENTIMENT_MAX_WAIT_MS", "5"))
+    SENTIMENT_MAX_QUEUE = int(os.getenv("SENTIMENT_MAX_QUEUE", "1024"))
+    INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "fp32")
+    ONNX_DIR = os.getenv("ONNX_DIR", "data/onnx")
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshot")
+    SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+    SNAPSHOT_WINDOWS = [int(days) for days in os.getenv("SNAPSHOT_WINDOWS", "7,30,90").split(",")]
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+    ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "365"))
@@ -1,18 +1,130 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, chatbot, images
+from app.routers import auth, chatbot, images, sentiment
+from app.clients import clients
 from app.config import Config
 
-app = FastAPI()
+logger = logging.getLogger("prevently.startup")
+
+WARMERS = {
+    'auth': auth.warm_caches,
+    'chatbot': chatbot.warm_caches,
+    'sentiment': sentiment.warm_caches,
+}
+
+
+async def _timed(phases: dict, name: str, func, *args):
+    started = time.perf_counter()
+    try:
+        result = func(*args)
+        if asyncio.iscoroutine(result):
+            await result
+        phases[name] = {'ms': round((time.perf_counter() - started) * 1000, 1), 'ok': True}
+    except Exception as e:
+        phases[name] = {'ms': round((time.perf_counter() - started) * 1000, 1), 'ok': False, 'error': str(e)}
+        logger.warning("Startup phase %s failed: %s", name, e)
+
+
+async def _create_clients(phases: dict):
+    names = ['firestore']
+    if Config.ANTHROPIC_API_KEY:
+        names.append('anthropic')
+    await asyncio.gather(*(
+        _timed(phases, f"client:{name}", asyncio.to_thread, clients.get, name)
+        for name in names
+    ))
+
+
+async def _warm_caches(phases: dict):
+    await asyncio.gather(*(
+        _timed(phases, f"warm:{name}", asyncio.to_thread, warmer)
+        for name, warmer in WARMERS.items()
+    ))
+    logger.info("Startup phases: %s", phases)
+
+
+async def _refresh_snapshot(interval: float):
+    """Rebuild the shared hot-data snapshot whenever this worker holds the leader lock"""
+    builder = await asyncio.to_thread(auth.get_snapshot_builder)
+    while True:
+        try:
+            if builder.try_lead():
+                version = await asyncio.to_thread(builder.build)
+                logger.info("Published snapshot version %s", version)
+        except Exception as e:
+            logger.warning("Snapshot refresh failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    phases = {}
+    app.state.startup_phases = phases
+    started = time.perf_counter()
+
+    if app.state.eager_clients:
+        await _create_clients(phases)
+    phases['ready'] = {'ms': round((time.perf_counter() - started) * 1000, 1), 'ok': True}
+
+    warmup = asyncio.create_task(_warm_caches(phases)) if app.state.warm_caches else None
+    refresher = None
+    if app.state.refresh_snapshot and Config.SNAPSHOT_INTERVAL_SECONDS > 0:
+        refresher = asyncio.create_task(_refresh_snapshot(Config.SNAPSHOT_INTERVAL_SECONDS))
+    try:
+        yield
+    finally:
+        for task in (warmup, refresher):
+            if task is not None and not task.done():
+                task.cancel()
+        await asyncio.to_thread(clients.close)
+
+
+def create_app(eager_clients: bool = True, warm_caches: bool = True, refresh_snapshot: bool = True,
+               **client_overrides) -> FastAPI:
+    """Build the API app.
+
+    Clients are created concurrently when the app starts (or lazily on first
+    use when ``eager_clients`` is off) and closed on shutdown. Keyword
+    arguments such as ``firestore=...`` replace the real clients with local
+    stand-ins. With ``refresh_snapshot`` on, one worker at a time rebuilds
+    the shared snapshot behind the hot read endpoints.
+    """
+    if client_overrides:
+        clients.override(**client_overrides)
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.eager_clients = eager_clients
+    app.state.warm_caches = warm_caches
+    app.state.refresh_snapshot = refresh_snapshot
+    app.state.startup_phases = {}
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=Config.CORS_ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.include_router(auth.router, prefix="/auth", tags=["auth"])
+    app.include_router(chatbot.router, prefix="/api", tags=["chatbot"])
+    app.include_router(images.router, prefix="/images", tags=["images"])
+    app.include_router(sentiment.router, prefix="/api", tags=["sentiment"])
+
+    @app.get("/health", tags=["health"])
+    async def health():
+        return {
+            "status": "ok",
+            "clients": {name: clients.is_ready(name) for name in ('firestore', 'anthropic')},
+            "startup_phases": app.state.startup_phases,
+        }
+
+    return app
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=Config.CORS_ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(chatbot.router, prefix="/api", tags=["chatbot"])
-app.include_router(images.router, prefix="/images", tags=["images"])
\ No newline at end of file
+app = create_app()
@@ -1,42 +1,101 @@
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 import requests
 from pydantic import BaseModel
 from app.config import Config
 import json
 from typing import Optional
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-import firebase_admin
-from firebase_admin import credentials, firestore
-import os
 from collections import defaultdict
+from app.clients import DESCENDING, clients, get_db
+from app.services.archive import ArticleArchive, to_article_data
+from app.services.articles import ArticleFilters, parse_companies, to_article_response, to_domain_info
+from app.services.cache import TTLCache
+from app.services.embeddings import EmbeddingIndex, load_encoder
+from app.services.export import EXPORT_FORMATS, export_articles, iter_articles
+from app.services.leaderboard import CompanyLeaderboard, LEADERBOARD_METRICS
+from app.services.snapshot import LATEST_NEWS_LIMIT, SnapshotBuilder, SnapshotReader, analytics_key
+from app.services.usernames import UsernameService, UsernameTaken
+import re
 
 router = APIRouter()
 
-if not firebase_admin._apps:
-    if Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH and os.path.exists(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH):
-        cred = credentials.Certificate(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH)
-    else:
-        cred = credentials.ApplicationDefault()
-    
-    firebase_admin.initialize_app(cred, {
-        'projectId': Config.FIREBASE_PROJECT_ID
-    })
+domain_cache = TTLCache(maxsize=256, ttl=300)
+
+USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_]{3,20}$")
+
+def get_leaderboard() -> CompanyLeaderboard:
+    return clients.get('company_leaderboard', lambda: CompanyLeaderboard(get_db()))
+
+def get_username_service() -> UsernameService:
+    return clients.get('username_service', lambda: UsernameService(get_db()))
+
+def get_embedding_index() -> EmbeddingIndex:
+    return clients.get('embedding_index', lambda: EmbeddingIndex(
+        Config.EMBEDDINGS_DIR, load_encoder(Config.EMBEDDINGS_MODEL)
+    ))
+
+def get_archive() -> ArticleArchive:
+    return clients.get('article_archive', lambda: ArticleArchive(Config.ARCHIVE_DIR))
+
+def get_snapshot() -> SnapshotReader:
+    return clients.get('hot_snapshot', lambda: SnapshotReader(
+        Config.SNAPSHOT_DIR, max_age=3 * Config.SNAPSHOT_INTERVAL_SECONDS
+    ))
+
+def get_snapshot_builder() -> SnapshotBuilder:
+    return clients.get('snapshot_builder', lambda: SnapshotBuilder(
+        get_db(), Config.SNAPSHOT_DIR, windows=Config.SNAPSHOT_WINDOWS, archive=get_archive()
+    ))
+
+def snapshot_response(payload: Optional[bytes]) -> Optional[Response]:
+    return None if payload is None else Response(content=payload, media_type="application/json")
+
+class SemanticSearchRequest(BaseModel):
+    query: str
+    limit: int = 10
+
+async def get_articles_by_ids(scored_ids: list) -> list:
+    """Fetch articles for (id, score) pairs, keeping the given order; tiered articles come from the archive"""
+    db = get_db()
+    refs = [db.collection('news_datastore').document(article_id) for article_id, _ in scored_ids]
+    docs = {doc.id: doc.to_dict() for doc in db.get_all(refs) if doc.exists}
+    missing = [article_id for article_id, _ in scored_ids if article_id not in docs]
+    if missing:
+        archived = await run_in_threadpool(get_archive().find, missing)
+        docs.update((article_id, to_article_data(row)) for article_id, row in archived.items())
+
+    articles = []
+    for article_id, score in scored_ids:
+        article_data = docs.get(article_id)
+        if article_data is None:
+            continue
+
+        domain_info = await get_domain_by_id(article_data.get('domain', ''))
+        articles.append({
+            **to_article_response({'id': article_id, **article_data}, domain_info),
+            'similarity': round(score, 4)
+        })
+    return articles
 
-db = firestore.client()
+def warm_caches():
+    for doc in get_db().collection('domains').stream():
+        domain_cache.set(doc.id, to_domain_info(doc.id, doc.to_dict()))
+    get_username_service().rebuild()
+    get_embedding_index()
 
 async def get_domain_by_id(domain_id: str) -> dict:
     """Fetch domain information by ID"""
+    cached = domain_cache.get(domain_id)
+    if cached is not None:
+        return cached
     try:
-        doc_ref = db.collection('domains').document(domain_id)
+        doc_ref = get_db().collection('domains').document(domain_id)
         doc = doc_ref.get()
         if doc.exists:
-            domain_data = doc.to_dict()
-            return {
-                'id': doc.id,
-                'name': domain_data.get('name', ''),
-                'description': domain_data.get('description', '')
-            }
+            domain_info = to_domain_info(doc.id, doc.to_dict())
+            domain_cache.set(domain_id, domain_info)
+            return domain_info
         return {
             'id': domain_id,
             'name': domain_id,
@@ -51,22 +110,15 @@ async def get_domain_by_id(domain_id: str) -> dict:
 
 async def get_email_from_username(username: str) -> Optional[str]:
     try:
-        doc_ref = db.collection('usernames').document(username.lower())
-        doc = doc_ref.get()
-        if doc.exists:
-            return doc.to_dict().get('email')
-        return None
+        return get_username_service().resolve_email(username)
     except Exception as e:
         return None
 
 async def save_username_mapping(username: str, email: str):
     try:
-        doc_ref = db.collection('usernames').document(username.lower())
-        doc_ref.set({
-            'email': email,
-            'username': username.lower(),
-            'created_at': firestore.SERVER_TIMESTAMP
-        })
+        get_username_service().reserve(username, email)
+    except UsernameTaken:
+        raise HTTPException(status_code=409, detail="Username is already taken")
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to save user data")
 
@@ -93,6 +145,11 @@ class LogoutRequest(BaseModel):
 
 @router.post("/register")
 async def register_user(request: RegisterRequest):
+    if not USERNAME_PATTERN.match(request.username):
+        raise HTTPException(status_code=400, detail="Username must be 3-20 characters, letters, numbers, and underscores only")
+
+    await save_username_mapping(request.username, request.email)
+
     url = f"https://identitytoolkit.googleapis.com/v1/accounts:signUp?key={Config.FIREBASE_API_KEY}"
     payload = {
         "email": request.email,
@@ -100,15 +157,18 @@ async def register_user(request: RegisterRequest):
         "displayName": request.username,
         "returnSecureToken": True
     }
-    response = requests.post(url, json=payload)
+    try:
+        response = requests.post(url, json=payload)
+    except Exception as e:
+        get_username_service().release(request.username)
+        raise HTTPException(status_code=500, detail="Failed to create account")
     if response.status_code != 200:
+        get_username_service().release(request.username)
         raise HTTPException(status_code=response.status_code, detail=response.json())
     
     user_data = response.json()
     id_token = user_data.get("idToken")
     
-    await save_username_mapping(request.username, request.email)
-    
     verify_url = f"https://identitytoolkit.googleapis.com/v1/accounts:sendOobCode?key={Config.FIREBASE_API_KEY}"
     verify_payload = {
         "requestType": "VERIFY_EMAIL",
@@ -121,6 +181,15 @@ async def register_user(request: RegisterRequest):
     
     return {"message": "Registration successful. Please check your email to verify your account."}
 
+@router.get("/username-available")
+async def check_username_available(username: str):
+    if not USERNAME_PATTERN.match(username):
+        raise HTTPException(status_code=400, detail="Username must be 3-20 characters, letters, numbers, and underscores only")
+    try:
+        return {"username": username, "available": get_username_service().is_available(username)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to check username availability")
+
 @router.post("/verify-email")
 async def verify_email(request: VerifyEmailRequest):    
     url = f"https://identitytoolkit.googleapis.com/v1/accounts:update?key={Config.FIREBASE_API_KEY}"
@@ -234,6 +303,9 @@ async def logout_user(request: LogoutRequest):
 
 @router.post("/google")
 async def google_auth(request: GoogleAuthRequest):
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+
     try:
         idinfo = id_token.verify_oauth2_token(request.id_token, google_requests.Request())
 
@@ -279,18 +351,18 @@ async def google_auth(request: GoogleAuthRequest):
 
 @router.get("/domains")
 async def get_domains():
+    cached = snapshot_response(get_snapshot().get('domains'))
+    if cached is not None:
+        return cached
     try:
-        domains_ref = db.collection('domains')
+        domains_ref = get_db().collection('domains')
         docs = domains_ref.stream()
 
         domains = []
         for doc in docs:
-            domain_data = doc.to_dict()
-            domains.append({
-                'id': doc.id,
-                'name': domain_data.get('name', ''),
-                'description': domain_data.get('description', '')
-            })
+            domain_info = to_domain_info(doc.id, doc.to_dict())
+            domain_cache.set(doc.id, domain_info)
+            domains.append(domain_info)
 
         domains.sort(key=lambda x: x['name'])
 
@@ -312,7 +384,7 @@ async def get_news_by_domain(
         limit = min(max(limit, 1), 50)
         offset = (page - 1) * limit
 
-        query = db.collection('news_datastore').where('domain', '==', domain)
+        query = get_db().collection('news_datastore').where('domain', '==', domain)
 
         if date_from is not None and date_to is not None:
             query = query.where('timestamp', '>=', date_from).where('timestamp', '<=', date_to)
@@ -321,7 +393,7 @@ async def get_news_by_domain(
         elif date_to is not None:
             query = query.where('timestamp', '<=', date_to)
 
-        docs = query.order_by('timestamp', direction=firestore.Query.DESCENDING).stream()
+        docs = query.order_by('timestamp', direction=DESCENDING).stream()
 
         all_articles = []
         for doc in docs:
@@ -374,10 +446,13 @@ async def get_news_by_domain(
 
 @router.get("/news/latest/{limit}")
 async def get_latest_news(limit: int = 20):
+    limit = min(max(limit, 1), LATEST_NEWS_LIMIT)
+    cached = snapshot_response(get_snapshot().get_list('news_latest', limit))
+    if cached is not None:
+        return cached
     try:
-        limit = min(max(limit, 1), 500)
 
-        news_ref = db.collection('news_datastore').order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit)
+        news_ref = get_db().collection('news_datastore').order_by('timestamp', direction=DESCENDING).limit(limit)
         docs = news_ref.stream()
 
         articles = []
@@ -385,38 +460,57 @@ async def get_latest_news(limit: int = 20):
             article_data = doc.to_dict()
             
             domain_info = await get_domain_by_id(article_data.get('domain', ''))
-            
-            articles.append({
-                'id': article_data.get('id', ''),
-                'title': article_data.get('title', ''),
-                'description': article_data.get('description', ''),
-                'domain': domain_info,
-                'companies': article_data.get('companies', []),
-                'source': article_data.get('source', ''),
-                'source_url': article_data.get('source_url', ''),
-                'sentiment_numeric': article_data.get('sentiment_numeric', 0),
-                'sentiment_result': article_data.get('sentiment_result', {}),
-                'sentiment_sublabel': article_data.get('sentiment_sublabel', ''),
-                'timestamp': article_data.get('timestamp', 0)
-            })
+            articles.append(to_article_response(article_data, domain_info))
 
         return {"articles": articles}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrieve latest news articles")
 
+@router.get("/news/{article_id}/related")
+async def get_related_news(article_id: str, limit: int = 10):
+    try:
+        limit = min(max(limit, 1), 50)
+        related = await run_in_threadpool(lambda: get_embedding_index().related(article_id, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve related articles")
+
+    if related is None:
+        raise HTTPException(status_code=404, detail="Article not found in the embeddings index")
+
+    try:
+        return {"articles": await get_articles_by_ids(related)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve related articles")
+
+@router.post("/news/semantic")
+async def semantic_news_search(request: SemanticSearchRequest):
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    try:
+        limit = min(max(request.limit, 1), 50)
+        matches = await run_in_threadpool(lambda: get_embedding_index().search(request.query, limit))
+        return {"articles": await get_articles_by_ids(matches)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to run semantic search")
+
 @router.get("/analytics/sentiment")
 async def get_sentiment_analytics(days: int = 30, domain: str = None):
+    cached = snapshot_response(get_snapshot().get(analytics_key(days, domain)))
+    if cached is not None:
+        return cached
     try:
         import time
         current_time = int(time.time() * 1000)
         days_ago = current_time - (days * 24 * 60 * 60 * 1000)
+        archive = get_archive()
+        horizon = archive.archived_before()
 
-        query = db.collection('news_datastore').where('timestamp', '>=', days_ago)
+        query = get_db().collection('news_datastore').where('timestamp', '>=', max(days_ago, horizon or 0))
 
         if domain and domain != 'all':
             query = query.where('domain', '==', domain)
 
-        docs = query.order_by('timestamp', direction=firestore.Query.DESCENDING).stream()
+        docs = query.order_by('timestamp', direction=DESCENDING).stream()
 
         from collections import defaultdict
         daily_sentiment = defaultdict(list)
@@ -430,6 +524,13 @@ async def get_sentiment_analytics(days: int = 30, domain: str = None):
             date = datetime.datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d')
             daily_sentiment[date].append(sentiment)
 
+        if archive.covers(days_ago):
+            import datetime
+            archived = ArticleFilters(domains=[domain] if domain and domain != 'all' else [], date_from=days_ago)
+            for row in archive.iter_rows(archived, columns=['timestamp', 'sentiment_numeric']):
+                date = datetime.datetime.fromtimestamp(row['timestamp'] / 1000).strftime('%Y-%m-%d')
+                daily_sentiment[date].append(row['sentiment_numeric'])
+
         analytics_data = []
         for date, sentiments in sorted(daily_sentiment.items()):
             avg_sentiment = sum(sentiments) / len(sentiments)
@@ -446,68 +547,35 @@ async def get_sentiment_analytics(days: int = 30, domain: str = None):
 @router.post("/analytics/advanced")
 async def get_advanced_analytics(request: dict):
     try:
-        domains = request.get('domains', [])
-        companies = request.get('companies', [])
-        date_from = request.get('date_from')
-        date_to = request.get('date_to')
-        sentiment_filter = request.get('sentiment_filter', 'all')
-
-        query = db.collection('news_datastore').order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1000)
-        docs = query.stream()
+        filters = ArticleFilters.from_dict(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        domains = filters.domains
+        companies = filters.companies
+        date_from = filters.date_from
+        date_to = filters.date_to
+        sentiment_filter = filters.sentiment_filter
 
         articles = []
+        total_articles = 0
         domain_stats = defaultdict(lambda: {'count': 0, 'sentiment_sum': 0, 'sentiments': []})
         company_stats = defaultdict(lambda: {'count': 0, 'sentiment_sum': 0})
         daily_stats = defaultdict(lambda: {'count': 0, 'sentiment_sum': 0, 'sentiments': []})
 
-        for doc in docs:
-            article_data = doc.to_dict()
+        async def add_article(article_data: dict, article_companies: list):
+            nonlocal total_articles
             sentiment = article_data.get('sentiment_numeric', 0)
             domain = article_data.get('domain', '')
-            companies_raw = article_data.get('companies', [])
-            
-            if isinstance(companies_raw, str):
-                article_companies = [c.strip() for c in companies_raw.replace(',', ';').split(';') if c.strip() and len(c.strip()) > 1]
-            elif isinstance(companies_raw, list):
-                article_companies = companies_raw
-            else:
-                article_companies = []
-                
             timestamp = article_data.get('timestamp', 0)
 
-            if domains and domain not in domains:
-                continue
-
-            if date_from is not None and timestamp < date_from:
-                continue
-            if date_to is not None and timestamp > date_to:
-                continue
-
-            if sentiment_filter == "positive" and sentiment < 0.1:
-                continue
-            elif sentiment_filter == "neutral" and (sentiment <= -0.1 or sentiment >= 0.1):
-                continue
-            elif sentiment_filter == "negative" and sentiment > -0.1:
-                continue
-
-            if companies and not any(company in article_companies for company in companies):
-                continue
+            if not filters.matches(domain, article_companies, sentiment, timestamp):
+                return
 
-            domain_info = await get_domain_by_id(domain)
-
-            articles.append({
-                'id': article_data.get('id', ''),
-                'title': article_data.get('title', ''),
-                'description': article_data.get('description', ''),
-                'domain': domain_info,
-                'companies': article_companies,
-                'source': article_data.get('source', ''),
-                'source_url': article_data.get('source_url', ''),
-                'sentiment_numeric': sentiment,
-                'sentiment_result': article_data.get('sentiment_result', {}),
-                'sentiment_sublabel': article_data.get('sentiment_sublabel', ''),
-                'timestamp': timestamp
-            })
+            total_articles += 1
+            if len(articles) < 100:
+                domain_info = await get_domain_by_id(domain)
+                articles.append({**to_article_response(article_data, domain_info), 'companies': article_companies})
 
             domain_stats[domain]['count'] += 1
             domain_stats[domain]['sentiment_sum'] += sentiment
@@ -523,6 +591,17 @@ async def get_advanced_analytics(request: dict):
             daily_stats[date]['sentiment_sum'] += sentiment
             daily_stats[date]['sentiments'].append(sentiment)
 
+        archive = get_archive()
+        if date_from is not None and archive.covers(date_from):
+            for row in iter_articles(get_db(), filters, archive=archive):
+                row['sentiment_result'] = {'label': row.pop('sentiment_label'), 'score': row.pop('sentiment_score')}
+                await add_article(row, row['companies'])
+        else:
+            query = get_db().collection('news_datastore').order_by('timestamp', direction=DESCENDING).limit(1000)
+            for doc in query.stream():
+                article_data = doc.to_dict()
+                await add_article(article_data, parse_companies(article_data.get('companies', [])))
+
         domain_analytics = []
         for domain, stats in domain_stats.items():
             if stats['count'] > 0:
@@ -547,6 +626,7 @@ async def get_advanced_analytics(request: dict):
                     'mention_count': stats['count'],
                     'avg_sentiment': round(avg_sentiment, 3)
                 })
+        company_analytics.sort(key=lambda c: c['mention_count'], reverse=True)
 
         daily_analytics = []
         for date, stats in sorted(daily_stats.items()):
@@ -564,12 +644,12 @@ async def get_advanced_analytics(request: dict):
                 })
 
         return {
-            "articles": articles[:100],
+            "articles": articles,
             "analytics": {
                 "domain_breakdown": domain_analytics,
                 "company_breakdown": company_analytics[:20],
                 "daily_trends": daily_analytics,
-                "total_articles": len(articles),
+                "total_articles": total_articles,
                 "date_range": {
                     "from": date_from,
                     "to": date_to
@@ -584,10 +664,82 @@ async def get_advanced_analytics(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve advanced analytics: {str(e)}")
 
+@router.post("/news/export")
+async def export_news(request: dict, format: str = "ndjson"):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    try:
+        filters = ArticleFilters.from_dict(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _, media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        export_articles(get_db(), filters, format, archive=get_archive()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="prevently-news.{extension}"'}
+    )
+
+@router.get("/alerts")
+async def get_alerts(limit: int = 50, domain: str = None, company: str = None, since: int = None):
+    try:
+        limit = min(max(limit, 1), 200)
+
+        query = get_db().collection('alerts')
+        if company:
+            query = query.where('scope', '==', 'company').where('subject', '==', company)
+        elif domain and domain != 'all':
+            query = query.where('scope', '==', 'domain').where('subject', '==', domain)
+        if since is not None:
+            query = query.where('timestamp', '>=', since)
+
+        docs = query.order_by('timestamp', direction=DESCENDING).limit(limit).stream()
+
+        alerts = []
+        for doc in docs:
+            alert = doc.to_dict()
+            alert['id'] = doc.id
+            alerts.append(alert)
+
+        return {"alerts": alerts}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve alerts")
+
+@router.get("/companies/leaderboard")
+async def get_company_leaderboard(
+    days: int = 30,
+    domain: str = None,
+    metric: str = "mentions",
+    k: int = 20,
+    min_mentions: int = 3,
+    end: str = None
+):
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"Unsupported metric. Use one of: {', '.join(LEADERBOARD_METRICS)}")
+    try:
+        days = min(max(days, 1), 3650)
+        k = min(max(k, 1), 100)
+        companies = get_leaderboard().top(
+            days=days,
+            domain=domain if domain and domain != 'all' else None,
+            k=k,
+            metric=metric,
+            min_mentions=max(min_mentions, 1),
+            end=end
+        )
+        return {"metric": metric, "days": days, "domain": domain or "all", "companies": companies}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve company leaderboard")
+
 @router.get("/companies")
 async def get_companies():
+    cached = snapshot_response(get_snapshot().get('companies'))
+    if cached is not None:
+        return cached
     try:
-        docs = db.collection('news_datastore').stream()
+        docs = get_db().collection('news_datastore').stream()
 
         companies_set = set()
         for doc in docs:
@@ -605,6 +757,9 @@ async def get_companies():
                 if company and len(company.strip()) > 1:
                     companies_set.add(company.strip())
 
+        for row in get_archive().iter_rows(ArticleFilters(), columns=['companies']):
+            companies_set.update(company.strip() for company in row['companies'] or [] if company and len(company.strip()) > 1)
+
         companies_list = sorted(list(companies_set))
 
         return {"companies": companies_list}
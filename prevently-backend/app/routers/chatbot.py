@@ -1,32 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional
-import anthropic
 from app.config import Config
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
 import time
 from collections import defaultdict
+from datetime import date
+from functools import lru_cache
 import json
+import re
+from app.clients import DESCENDING, clients, get_db
+from app.services.cache import TTLCache
+from app.services.chat_sessions import ChatSessionStore, split_history
+from app.services.query_dsl import QuerySyntaxError, validate_query
 
 router = APIRouter()
 
-if not firebase_admin._apps:
-    if Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH and os.path.exists(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH):
-        cred = credentials.Certificate(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH)
-    else:
-        cred = credentials.ApplicationDefault()
-    
-    firebase_admin.initialize_app(cred, {
-        'projectId': Config.FIREBASE_PROJECT_ID
-    })
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'prompts')
 
-db = firestore.client()
+query_cache = TTLCache(maxsize=1024, ttl=6 * 60 * 60)
+
+def get_chat_sessions() -> ChatSessionStore:
+    return clients.get('chat_sessions', lambda: ChatSessionStore(
+        get_db() if Config.CHAT_SESSION_BACKEND == "firestore" else None
+    ))
+
+@lru_cache(maxsize=None)
+def load_prompt(filename: str) -> str:
+    with open(os.path.join(PROMPTS_DIR, filename), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def warm_caches():
+    for filename in ('clara_system_prompt.txt', 'query_generation_prompt.txt', 'chat_summary_prompt.txt'):
+        load_prompt(filename)
+
+def render_prompt(template: str, variables: dict) -> str:
+    for key, value in variables.items():
+        placeholder = "{{" + key + "}}"
+        template = template.replace(placeholder, str(value))
+    return template
+
+def normalize_query_prompt(prompt: str) -> str:
+    prompt = re.sub(r"\s+", " ", prompt.strip().lower())
+    return prompt.rstrip(" .!?")
 
 async def get_recent_news(limit: int = 5) -> str:
     try:
-        news_ref = db.collection('news_datastore').order_by('timestamp', direction=firestore.Query.DESCENDING).limit(limit)
+        news_ref = get_db().collection('news_datastore').order_by('timestamp', direction=DESCENDING).limit(limit)
         docs = news_ref.stream()
 
         articles = []
@@ -60,8 +80,8 @@ async def get_sentiment_analytics_summary(days: int = 7) -> str:
         current_time = int(time.time() * 1000)
         days_ago = current_time - (days * 24 * 60 * 60 * 1000)
 
-        query = db.collection('news_datastore').where('timestamp', '>=', days_ago)
-        docs = query.order_by('timestamp', direction=firestore.Query.DESCENDING).stream()
+        query = get_db().collection('news_datastore').where('timestamp', '>=', days_ago)
+        docs = query.order_by('timestamp', direction=DESCENDING).stream()
 
         from collections import defaultdict
         domain_sentiment = defaultdict(list)
@@ -104,6 +124,7 @@ async def get_sentiment_analytics_summary(days: int = 7) -> str:
 
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
     conversation_history: Optional[list] = None
     model: Optional[str] = "claude-3-5-haiku-20241022"
     system_prompt: Optional[str] = None
@@ -113,6 +134,7 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     response: str
+    session_id: Optional[str] = None
 
 class QueryGenerationRequest(BaseModel):
     prompt: str
@@ -124,55 +146,90 @@ class QueryGenerationResponse(BaseModel):
 def get_anthropic_client():
     if not Config.ANTHROPIC_API_KEY:
         raise HTTPException(status_code=500, detail="Anthropic API key not configured")
-    return anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+    return clients.anthropic()
+
+def summarize_session_history(session_id: str):
+    """Fold turns that no longer fit the history budget into the session summary.
+
+    Runs as a background task after the chat response has been sent.
+    """
+    session = get_chat_sessions().get(session_id)
+    if session is None:
+        return
+
+    with session.lock:
+        if session.summarizing:
+            return
+        overflow, _ = split_history(session.messages, Config.CHAT_HISTORY_TOKEN_BUDGET)
+        if not overflow:
+            return
+        session.summarizing = True
+
+    try:
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in overflow)
+        response = get_anthropic_client().messages.create(
+            model="claude-3-5-haiku-20241022",
+            max_tokens=400,
+            temperature=0,
+            system=load_prompt('chat_summary_prompt.txt'),
+            messages=[{
+                "role": "user",
+                "content": f"Previous summary:\n{session.summary or '(none)'}\n\nTurns to fold in:\n{transcript}"
+            }]
+        )
+        with session.lock:
+            current = get_chat_sessions().get(session_id) or session
+            if current.messages[:len(overflow)] == overflow:
+                current.summary = response.content[0].text.strip()
+                current.messages = current.messages[len(overflow):]
+                get_chat_sessions().save(current)
+    except Exception:
+        pass
+    finally:
+        session.summarizing = False
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_ai(request: ChatRequest):
+async def chat_with_ai(request: ChatRequest, background_tasks: BackgroundTasks):
+    import anthropic
+
     try:
         client = get_anthropic_client()
+        chat_sessions = get_chat_sessions()
 
-        messages = []
-
-        if request.conversation_history:
-            for msg in request.conversation_history[-10:]:
-                role = "user" if msg.get("sender") == "user" else "assistant"
-                messages.append({
-                    "role": role,
-                    "content": msg.get("content", "")
-                })
+        session = chat_sessions.get_or_create(request.session_id)
+        history = [
+            {"role": "user" if msg.get("sender") == "user" else "assistant", "content": msg.get("content", "")}
+            for msg in request.conversation_history or []
+        ]
+        if history and (not session.messages or session.messages[-1]["content"] != history[-1]["content"]):
+            # This worker has no copy of the session, or an older one: continue from what the client has seen
+            session.messages = history
 
-        messages.append({
+        user_message = {
             "role": "user",
             "content": request.message
-        })
+        }
+        _, messages = split_history(session.messages + [user_message], Config.CHAT_HISTORY_TOKEN_BUDGET)
+        if not messages:
+            messages = [user_message]
 
         if request.system_prompt:
             system_prompt = request.system_prompt
         else:
-            prompt_file = os.path.join(os.path.dirname(__file__), '..', 'prompts', 'clara_system_prompt.txt')
             try:
-                with open(prompt_file, 'r', encoding='utf-8') as f:
-                    system_prompt = f.read()
+                system_prompt = load_prompt('clara_system_prompt.txt')
             except FileNotFoundError:
                 raise HTTPException(status_code=500, detail="System prompt file not found")
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Error loading system prompt: {str(e)}")
 
-        if request.context_variables:
-            request.context_variables['recent_news'] = await get_recent_news(5)
-            request.context_variables['sentiment_analytics'] = await get_sentiment_analytics_summary(7)
-            
-            for key, value in request.context_variables.items():
-                placeholder = "{{" + key + "}}"
-                system_prompt = system_prompt.replace(placeholder, str(value))
-        else:
-            context_vars = {
-                'recent_news': await get_recent_news(5),
-                'sentiment_analytics': await get_sentiment_analytics_summary(7)
-            }
-            for key, value in context_vars.items():
-                placeholder = "{{" + key + "}}"
-                system_prompt = system_prompt.replace(placeholder, str(value))
+        context_vars = dict(request.context_variables or {})
+        context_vars['recent_news'] = await get_recent_news(5)
+        context_vars['sentiment_analytics'] = await get_sentiment_analytics_summary(7)
+        system_prompt = render_prompt(system_prompt, context_vars)
+
+        if session.summary:
+            system_prompt += f"\n\n## Earlier in this conversation:\n{session.summary}"
 
         response = client.messages.create(
             model=request.model,
@@ -182,7 +239,13 @@ async def chat_with_ai(request: ChatRequest):
             messages=messages
         )
 
-        return ChatResponse(response=response.content[0].text)
+        reply = response.content[0].text
+        session.append("user", request.message)
+        session.append("assistant", reply)
+        chat_sessions.save(session)
+        background_tasks.add_task(summarize_session_history, session.id)
+
+        return ChatResponse(response=reply, session_id=session.id)
 
     except anthropic.APIError as e:
         raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
@@ -191,13 +254,19 @@ async def chat_with_ai(request: ChatRequest):
 
 @router.post("/generate-query", response_model=QueryGenerationResponse)
 async def generate_query(request: QueryGenerationRequest):
+    import anthropic
+
     try:
+        today = date.today().isoformat()
+        cache_key = (normalize_query_prompt(request.prompt), today)
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         client = get_anthropic_client()
 
-        prompt_file = os.path.join(os.path.dirname(__file__), '..', 'prompts', 'query_generation_prompt.txt')
         try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                system_prompt = f.read()
+            system_prompt = render_prompt(load_prompt('query_generation_prompt.txt'), {'current_date': today})
         except FileNotFoundError:
             raise HTTPException(status_code=500, detail="Query generation prompt file not found")
         except Exception as e:
@@ -216,14 +285,23 @@ async def generate_query(request: QueryGenerationRequest):
             ]
         )
 
-        import json
         result = json.loads(response.content[0].text.strip())
         
-        return QueryGenerationResponse(
+        generated = QueryGenerationResponse(
             query=result.get("query", ""),
             explanation=result.get("explanation", "")
         )
 
+        try:
+            validate_query(generated.query)
+            query_cache.set(cache_key, generated)
+        except QuerySyntaxError:
+            pass
+
+        return generated
+
+    except HTTPException:
+        raise
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Failed to parse AI response")
     except anthropic.APIError as e:
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, UploadFile, HTTPException
-from google.cloud import firestore
+from app.clients import get_db
 import base64
 
 router = APIRouter()
-db = firestore.Client()
 
 CHUNK_SIZE = 300_000
 
@@ -14,6 +13,7 @@ async def upload_profile_image(username: str, file: UploadFile):
     image_id = f"{username}_profile"
     chunks = [contents[i:i+CHUNK_SIZE] for i in range(0, len(contents), CHUNK_SIZE)]
 
+    db = get_db()
     image_ref = db.collection("images").document(image_id)
     image_ref.set({
         "name": file.filename,
@@ -35,6 +35,7 @@ async def upload_profile_image(username: str, file: UploadFile):
 
 @router.get("/{image_id}")
 def get_image(image_id: str):
+    db = get_db()
     image_ref = db.collection("images").document(image_id)
     doc = image_ref.get()
     if not doc.exists:
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from app.clients import clients
+from app.config import Config
+from app.services.batching import QueueFull
+from app.services.sentiment import SentimentService, load_sentiment_model
+
+router = APIRouter()
+
+MAX_TEXT_LENGTH = 20_000
+
+class SentimentRequest(BaseModel):
+    text: str
+
+class SentimentResponse(BaseModel):
+    sentiment_result: dict
+    sentiment_numeric: float
+    sentiment_sublabel: str
+
+def get_sentiment_service() -> SentimentService:
+    return clients.get('sentiment_service', lambda: SentimentService(
+        load_sentiment_model(Config.SENTIMENT_MODEL, Config.INFERENCE_BACKEND, Config.ONNX_DIR),
+        max_batch_size=Config.SENTIMENT_MAX_BATCH_SIZE,
+        max_wait_ms=Config.SENTIMENT_MAX_WAIT_MS,
+        max_queue=Config.SENTIMENT_MAX_QUEUE
+    ))
+
+def warm_caches():
+    get_sentiment_service()
+
+@router.post("/sentiment", response_model=SentimentResponse)
+async def score_sentiment(request: SentimentRequest):
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text must not be empty")
+    if len(request.text) > MAX_TEXT_LENGTH:
+        raise HTTPException(status_code=413, detail=f"Text must be at most {MAX_TEXT_LENGTH} characters")
+
+    try:
+        service = await run_in_threadpool(get_sentiment_service)
+        result = await service.score(request.text)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Sentiment scoring is overloaded, please retry shortly")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to score sentiment: {str(e)}")
+
+    return SentimentResponse(**result)
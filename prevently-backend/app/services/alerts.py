@@ -0,0 +1,174 @@
+import hashlib
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.services.articles import parse_companies
+from app.services.ingest import classify_subinterval
+
+
+class EwmaState:
+    __slots__ = ('key', 'mean', 'var', 'count', 'cusum', 'sublabel')
+
+    def __init__(self, key: str, mean: float = 0.0, var: float = 0.0, count: int = 0,
+                 cusum: float = 0.0, sublabel: Optional[str] = None):
+        self.key = key
+        self.mean = mean
+        self.var = var
+        self.count = count
+        self.cusum = cusum
+        self.sublabel = sublabel
+
+    def to_dict(self) -> dict:
+        return {
+            'key': self.key,
+            'mean': self.mean,
+            'var': self.var,
+            'count': self.count,
+            'cusum': self.cusum,
+            'sublabel': self.sublabel,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EwmaState":
+        return cls(data['key'], data.get('mean', 0.0), data.get('var', 0.0), data.get('count', 0),
+                   data.get('cusum', 0.0), data.get('sublabel'))
+
+
+class SentimentAnomalyDetector:
+    """Online negative-sentiment detector per domain and per company.
+
+    Each article updates an exponentially weighted mean/variance and a lower
+    CUSUM statistic for every key it touches, in constant time. Alerts fire when
+    an article's z-score against the running mean falls below ``-z_threshold``,
+    when the CUSUM crosses ``cusum_threshold`` (a sustained downward shift), or
+    when the smoothed mean enters one of ``alert_sublabels``. Stored state is
+    fetched only for the keys an ingest batch touches.
+    """
+
+    def __init__(self, db=None, alpha: float = 0.1, z_threshold: float = 2.5,
+                 alert_sublabels: Iterable[str] = ('Panic', 'Risk'), cusum_slack: float = 0.5,
+                 cusum_threshold: float = 5.0, min_observations: int = 10,
+                 collection: str = 'alerts', state_collection: str = 'anomaly_state'):
+        self.db = db
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.alert_sublabels = set(alert_sublabels)
+        self.cusum_slack = cusum_slack
+        self.cusum_threshold = cusum_threshold
+        self.min_observations = min_observations
+        self.collection = collection
+        self.state_collection = state_collection
+        self._states: Dict[str, EwmaState] = {}
+        self._dirty = set()
+        self._pending_alerts: List[dict] = []
+        self._fetched = set()
+
+    @staticmethod
+    def state_id(key: str) -> str:
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def keys_for(article: dict) -> List[str]:
+        keys = [f"domain:{article.get('domain', '') or 'unknown'}"]
+        keys.extend(f"company:{company}" for company in set(parse_companies(article.get('companies', []))))
+        return keys
+
+    def load(self, keys: Iterable[str]):
+        """Fetch the stored state of any ``keys`` not looked up yet, in one ``get_all``"""
+        missing = {self.state_id(key): key for key in keys if key not in self._fetched}
+        if not missing:
+            return
+        if self.db is not None:
+            collection = self.db.collection(self.state_collection)
+            for doc in self.db.get_all([collection.document(doc_id) for doc_id in missing]):
+                key = missing.get(doc.id)
+                if doc.exists and key is not None and key not in self._states:
+                    self._states[key] = EwmaState.from_dict(doc.to_dict())
+        self._fetched.update(missing.values())
+
+    def prepare(self, articles: List[dict]):
+        self.load(key for article in articles for key in self.keys_for(article))
+
+    def _alert(self, state: EwmaState, kind: str, value: float, z_score: Optional[float], article: dict) -> dict:
+        scope, subject = state.key.split(':', 1)
+        return {
+            'scope': scope,
+            'subject': subject,
+            'type': kind,
+            'value': round(value, 3),
+            'ewma_mean': round(state.mean, 3),
+            'z_score': round(z_score, 3) if z_score is not None else None,
+            'sublabel': state.sublabel,
+            'article_id': article.get('id', ''),
+            'title': article.get('title', ''),
+            'timestamp': article.get('timestamp', 0),
+            'created_at': int(time.time() * 1000),
+        }
+
+    def update(self, key: str, value: float, article: dict) -> List[dict]:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = EwmaState(key, mean=value, count=1, sublabel=classify_subinterval(value))
+            self._dirty.add(key)
+            return []
+
+        alerts = []
+        std = math.sqrt(state.var)
+        z_score = (value - state.mean) / std if std > 1e-9 else None
+        warmed_up = state.count >= self.min_observations
+
+        if warmed_up and z_score is not None:
+            if z_score <= -self.z_threshold:
+                alerts.append(self._alert(state, 'zscore', value, z_score, article))
+            state.cusum = max(0.0, state.cusum - z_score - self.cusum_slack)
+            if state.cusum >= self.cusum_threshold:
+                alerts.append(self._alert(state, 'change_point', value, z_score, article))
+                state.cusum = 0.0
+
+        diff = value - state.mean
+        increment = self.alpha * diff
+        state.mean += increment
+        state.var = (1 - self.alpha) * (state.var + diff * increment)
+        state.count += 1
+
+        previous_sublabel = state.sublabel
+        state.sublabel = classify_subinterval(state.mean)
+        if warmed_up and state.sublabel != previous_sublabel and state.sublabel in self.alert_sublabels:
+            alerts.append(self._alert(state, 'sublabel', value, z_score, article))
+
+        self._dirty.add(key)
+        return alerts
+
+    def record(self, article: dict) -> List[dict]:
+        sentiment = article.get('sentiment_numeric', 0) or 0
+        keys = self.keys_for(article)
+        self.load(keys)
+        alerts = []
+        for key in keys:
+            alerts.extend(self.update(key, sentiment, article))
+        self._pending_alerts.extend(alerts)
+        return alerts
+
+    def flush(self):
+        if self.db is None:
+            self._pending_alerts.clear()
+            self._dirty.clear()
+            return
+        batch = self.db.batch()
+        writes = 0
+        for alert in self._pending_alerts:
+            batch.set(self.db.collection(self.collection).document(), alert)
+            writes += 1
+            if writes % 400 == 0:
+                batch.commit()
+                batch = self.db.batch()
+        for key in self._dirty:
+            batch.set(self.db.collection(self.state_collection).document(self.state_id(key)), self._states[key].to_dict())
+            writes += 1
+            if writes % 400 == 0:
+                batch.commit()
+                batch = self.db.batch()
+        batch.commit()
+        self._pending_alerts.clear()
+        self._dirty.clear()
@@ -0,0 +1,304 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from app.clients import ASCENDING
+from app.services.articles import ArticleFilters
+from app.services.export import EXPORT_COLUMNS, parquet_schema, to_export_row
+
+MANIFEST = "_archive.json"
+
+ARCHIVE_SOURCE_FIELDS = [
+    'id', 'title', 'description', 'content', 'domain', 'companies', 'source', 'source_url',
+    'sentiment_numeric', 'sentiment_result', 'sentiment_sublabel', 'timestamp', 'duplicates'
+]
+
+_PART_FILE = re.compile(r"^part-(\d+)-(\d+)\.parquet$")
+_MATCH_COLUMNS = ['domain', 'companies', 'sentiment_numeric', 'timestamp']
+
+
+def month_of(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y-%m')
+
+
+def month_ranges(start: int, end: int) -> Iterator[Tuple[str, int, int]]:
+    """Split ``[start, end)`` in epoch millis into ``(month, lo, hi)`` pieces on UTC month boundaries"""
+    lo = start
+    while lo < end:
+        first = datetime.fromtimestamp(lo / 1000, tz=timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        following = first.replace(year=first.year + 1, month=1) if first.month == 12 else first.replace(month=first.month + 1)
+        hi = min(end, int(following.timestamp() * 1000))
+        yield first.strftime('%Y-%m'), lo, hi
+        lo = hi
+
+
+def archive_schema():
+    import pyarrow as pa
+
+    schema = parquet_schema()
+    schema = schema.remove(schema.get_field_index('domain'))
+    return schema.append(pa.field('content', pa.string())).append(pa.field('duplicates', pa.string()))
+
+
+def to_archive_row(article_data: dict) -> dict:
+    row = to_export_row(article_data)
+    row['content'] = article_data.get('content', '') or ''
+    row['duplicates'] = json.dumps(article_data.get('duplicates') or [], ensure_ascii=False)
+    return row
+
+
+def to_article_data(row: dict) -> dict:
+    """An archived export row in the Firestore document shape the API responses are built from"""
+    return {**row, 'sentiment_result': {'label': row.get('sentiment_label', ''), 'score': row.get('sentiment_score', 0.0)}}
+
+
+def build_filter(filters: ArticleFilters, before: int):
+    """Dataset expression for ``filters``; month and domain prune partitions, the rest uses row group statistics"""
+    import pyarrow.dataset as ds
+
+    timestamp = ds.field('timestamp')
+    sentiment = ds.field('sentiment_numeric')
+    expression = timestamp < before
+    if filters.date_from is not None:
+        expression &= (ds.field('month') >= month_of(filters.date_from)) & (timestamp >= filters.date_from)
+    if filters.date_to is not None:
+        expression &= (ds.field('month') <= month_of(filters.date_to)) & (timestamp <= filters.date_to)
+    if filters.domains:
+        expression &= ds.field('domain').isin(filters.domains)
+    if filters.sentiment_filter == "positive":
+        expression &= sentiment >= 0.1
+    elif filters.sentiment_filter == "neutral":
+        expression &= (sentiment > -0.1) & (sentiment < 0.1)
+    elif filters.sentiment_filter == "negative":
+        expression &= sentiment <= -0.1
+    if filters.sentiment_min is not None:
+        expression &= sentiment >= filters.sentiment_min
+    if filters.sentiment_max is not None:
+        expression &= sentiment <= filters.sentiment_max
+    return expression
+
+
+class ArticleArchive:
+    """Cold tier for ``news_datastore``: Parquet files partitioned by month and domain.
+
+    Files live under ``month=YYYY-MM/domain=<domain>/`` (hive layout) and are
+    zstd compressed with dictionary encoding. ``_archive.json`` records
+    ``archived_before``: every article older than it is in the archive, so
+    hot reads start there and an article is never counted in both tiers,
+    even if deleting it from Firestore has not finished yet. Articles that
+    reach Firestore below the horizon later (bulk uploads, backfills) are
+    archived by the next run before they are deleted.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._dataset = None
+        self._dataset_version = None
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            return manifest if "archived_before" in manifest else None
+        except (OSError, ValueError):
+            return None
+
+    def archived_before(self) -> Optional[int]:
+        manifest = self._read_manifest()
+        return None if manifest is None else manifest["archived_before"]
+
+    def covers(self, date_from: Optional[int]) -> bool:
+        """Whether a query starting at ``date_from`` needs archived articles"""
+        horizon = self.archived_before()
+        return horizon is not None and (date_from is None or date_from < horizon)
+
+    def _write_manifest(self, archived_before: int):
+        """Publish ``archived_before``; the revision tells readers to re-discover the files"""
+        revision = (self._read_manifest() or {}).get("revision", 0) + 1
+        path = os.path.join(self.directory, MANIFEST)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"archived_before": archived_before, "revision": revision}, f)
+        os.replace(tmp_path, path)
+
+    def _part_files(self) -> Iterator[Tuple[str, int]]:
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                match = _PART_FILE.match(name)
+                if match:
+                    yield os.path.join(root, name), int(match.group(1))
+
+    def _write_partition(self, month: str, domain: str, rows: List[dict], filename: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.join(self.directory, f"month={month}", f"domain={quote(domain, safe='')}")
+        os.makedirs(directory, exist_ok=True)
+        rows.sort(key=lambda row: row['timestamp'], reverse=True)
+        table = pa.Table.from_pylist(rows, schema=archive_schema())
+        path = os.path.join(directory, filename)
+        tmp_path = os.path.join(directory, f".{filename}.tmp")
+        pq.write_table(table, tmp_path, compression='zstd', use_dictionary=True, row_group_size=50_000)
+        os.replace(tmp_path, path)
+
+    def tier(self, db, before: int, delete: bool = True, collection: str = 'news_datastore') -> dict:
+        """Move articles older than ``before`` from Firestore into the archive.
+
+        Runs month by month and commits by advancing ``archived_before``.
+        Files left by an interrupted run start at or after the committed
+        horizon and are removed first, so the job can simply be re-run.
+        """
+        start = self.archived_before()
+        if start is None:
+            oldest = list(db.collection(collection).order_by('timestamp', direction=ASCENDING).limit(1).stream())
+            if not oldest:
+                return {"archived": 0, "deleted": 0, "archived_before": None}
+            start = oldest[0].to_dict().get('timestamp', 0)
+
+        archived = 0
+        if start < before:
+            os.makedirs(self.directory, exist_ok=True)
+            for path, lo in list(self._part_files()):
+                if lo >= start:
+                    os.remove(path)
+
+            for month, lo, hi in month_ranges(start, before):
+                query = (db.collection(collection).where('timestamp', '>=', lo).where('timestamp', '<', hi)
+                         .select(ARCHIVE_SOURCE_FIELDS))
+                by_domain = {}
+                for doc in query.stream():
+                    row = to_archive_row(doc.to_dict())
+                    row['id'] = row['id'] or doc.id
+                    by_domain.setdefault(row['domain'], []).append(row)
+                for domain, rows in by_domain.items():
+                    self._write_partition(month, domain, rows, f"part-{lo}-{hi}.parquet")
+                    archived += len(rows)
+            self._write_manifest(before)
+
+        horizon = max(start, before)
+        deleted = 0
+        if delete:
+            late, deleted = self.delete_archived(db, horizon, collection)
+            archived += late
+        return {"archived": archived, "deleted": deleted, "archived_before": horizon}
+
+    def archived_ids(self, ids: List[str], months: List[str]) -> set:
+        """Which of ``ids`` are already in the archive, looking only at ``months``"""
+        import pyarrow.dataset as ds
+
+        if not ids or self.archived_before() is None:
+            return set()
+        expression = ds.field('month').isin(months) & ds.field('id').isin(ids)
+        return set(self.dataset().to_table(columns=['id'], filter=expression).column('id').to_pylist())
+
+    def delete_archived(self, db, before: int, collection: str = 'news_datastore',
+                        batch_size: int = 500) -> Tuple[int, int]:
+        """Delete articles older than ``before`` from Firestore, archiving any the archive does not hold yet.
+
+        Returns ``(archived, deleted)``. Late rows go to ``late-<hash>.parquet``
+        files named after their ids, so a run interrupted before the delete
+        rewrites the same files instead of archiving the rows twice.
+        """
+        query = db.collection(collection).where('timestamp', '<', before).select(['id', 'timestamp']).limit(batch_size)
+        archived = deleted = 0
+        while True:
+            docs = list(query.stream())
+            if not docs:
+                return archived, deleted
+            keys = {doc.id: doc.to_dict().get('id') or doc.id for doc in docs}
+            months = sorted({month_of(doc.to_dict().get('timestamp', 0)) for doc in docs})
+            known = self.archived_ids(list(keys.values()), months)
+            late = [doc.reference for doc in docs if keys[doc.id] not in known]
+            if late:
+                partitions = {}
+                for doc in db.get_all(late):
+                    if not doc.exists:
+                        continue
+                    row = to_archive_row(doc.to_dict())
+                    row['id'] = row['id'] or doc.id
+                    partitions.setdefault((month_of(row['timestamp']), row['domain']), []).append(row)
+                for (month, domain), rows in partitions.items():
+                    digest = hashlib.sha1("\n".join(sorted(row['id'] for row in rows)).encode('utf-8')).hexdigest()[:16]
+                    self._write_partition(month, domain, rows, f"late-{digest}.parquet")
+                    archived += len(rows)
+                self._write_manifest(before)
+
+            batch = db.batch()
+            for doc in docs:
+                batch.delete(doc.reference)
+            batch.commit()
+            deleted += len(docs)
+
+    def dataset(self):
+        """The archive as a ``pyarrow.dataset`` over memory-mapped files, re-discovered after each tiering run"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        manifest = self._read_manifest() or {}
+        version = (manifest.get("archived_before"), manifest.get("revision"))
+        if self._dataset is None or version != self._dataset_version:
+            partitioning = ds.partitioning(pa.schema([('month', pa.string()), ('domain', pa.string())]), flavor='hive')
+            self._dataset = ds.dataset(self.directory, schema=archive_schema().append(pa.field('month', pa.string()))
+                                       .append(pa.field('domain', pa.string())), format='parquet',
+                                       partitioning=partitioning, filesystem=fs.LocalFileSystem(use_mmap=True))
+            self._dataset_version = version
+        return self._dataset
+
+    def months(self, filters: ArticleFilters) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        months = [name.split('=', 1)[1] for name in os.listdir(self.directory) if name.startswith('month=')]
+        if filters.date_from is not None:
+            months = [month for month in months if month >= month_of(filters.date_from)]
+        if filters.date_to is not None:
+            months = [month for month in months if month <= month_of(filters.date_to)]
+        return sorted(months, reverse=True)
+
+    def find(self, ids: Sequence[str], columns: Optional[Sequence[str]] = None) -> dict:
+        """Archived rows for ``ids`` by id; scans the id column of every month, so keep ``ids`` short"""
+        import pyarrow.dataset as ds
+
+        if not ids or self.archived_before() is None:
+            return {}
+        columns = list(dict.fromkeys(['id'] + list(columns or EXPORT_COLUMNS)))
+        table = self.dataset().to_table(columns=columns, filter=ds.field('id').isin(list(ids)))
+        return {row['id']: row for row in table.to_pylist()}
+
+    def _scan_file(self, fragment, columns: List[str], expression) -> Iterator[dict]:
+        import pyarrow.dataset as ds
+
+        scanner = ds.Scanner.from_fragment(fragment, schema=self.dataset().schema, columns=columns,
+                                           filter=expression, batch_size=10_000)
+        for batch in scanner.to_batches():
+            yield from batch.to_pylist()
+
+    def iter_rows(self, filters: ArticleFilters, columns: Optional[Sequence[str]] = None) -> Iterator[dict]:
+        """Archived articles matching ``filters``, newest first, as export rows (or just ``columns``).
+
+        Every file is written newest first, so the files of a month are
+        streamed side by side and merged on ``timestamp``; memory stays at one
+        record batch per open file whatever the size of the month.
+        """
+        import pyarrow.dataset as ds
+
+        before = self.archived_before()
+        if before is None:
+            return
+        columns = list(columns or EXPORT_COLUMNS)
+        scan_columns = list(dict.fromkeys(columns + _MATCH_COLUMNS))
+        dataset = self.dataset()
+        expression = build_filter(filters, before)
+
+        for month in self.months(filters):
+            month_expression = expression & (ds.field('month') == month)
+            streams = [self._scan_file(fragment, scan_columns, month_expression)
+                       for fragment in dataset.get_fragments(filter=month_expression)]
+            for row in heapq.merge(*streams, key=lambda row: row['timestamp'], reverse=True):
+                if filters.matches(row['domain'], row['companies'] or [], row['sentiment_numeric'], row['timestamp']):
+                    yield {name: row[name] for name in columns}
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+def parse_companies(companies_raw) -> List[str]:
+    if isinstance(companies_raw, str):
+        return [c.strip() for c in companies_raw.replace(',', ';').split(';') if c.strip() and len(c.strip()) > 1]
+    elif isinstance(companies_raw, list):
+        return companies_raw
+    return []
+
+
+def matches_sentiment_filter(sentiment: float, sentiment_filter: str) -> bool:
+    if sentiment_filter == "positive" and sentiment < 0.1:
+        return False
+    elif sentiment_filter == "neutral" and (sentiment <= -0.1 or sentiment >= 0.1):
+        return False
+    elif sentiment_filter == "negative" and sentiment > -0.1:
+        return False
+    return True
+
+
+SENTIMENT_FILTERS = ("all", "positive", "neutral", "negative")
+
+
+def _string_list(data: dict, key: str) -> List[str]:
+    value = data.get(key) or []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{key} must be a list of strings")
+    return value
+
+
+def _optional_number(data: dict, key: str, cast):
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{key} must be a number")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number")
+
+
+@dataclass
+class ArticleFilters:
+    """The filter set accepted by ``/auth/analytics/advanced`` and the export paths"""
+    domains: List[str] = field(default_factory=list)
+    companies: List[str] = field(default_factory=list)
+    date_from: Optional[int] = None
+    date_to: Optional[int] = None
+    sentiment_filter: str = "all"
+    sentiment_min: Optional[float] = None
+    sentiment_max: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArticleFilters":
+        """Build filters from a request body, raising ``ValueError`` on values of the wrong type"""
+        sentiment_filter = data.get('sentiment_filter') or 'all'
+        if sentiment_filter not in SENTIMENT_FILTERS:
+            raise ValueError(f"sentiment_filter must be one of: {', '.join(SENTIMENT_FILTERS)}")
+        return cls(
+            domains=_string_list(data, 'domains'),
+            companies=_string_list(data, 'companies'),
+            date_from=_optional_number(data, 'date_from', int),
+            date_to=_optional_number(data, 'date_to', int),
+            sentiment_filter=sentiment_filter,
+            sentiment_min=_optional_number(data, 'sentiment_min', float),
+            sentiment_max=_optional_number(data, 'sentiment_max', float),
+        )
+
+    def matches(self, domain: str, companies: List[str], sentiment: float, timestamp: int) -> bool:
+        if self.domains and domain not in self.domains:
+            return False
+        if self.date_from is not None and timestamp < self.date_from:
+            return False
+        if self.date_to is not None and timestamp > self.date_to:
+            return False
+        if not matches_sentiment_filter(sentiment, self.sentiment_filter):
+            return False
+        if self.sentiment_min is not None and sentiment < self.sentiment_min:
+            return False
+        if self.sentiment_max is not None and sentiment > self.sentiment_max:
+            return False
+        if self.companies and not any(company in companies for company in self.companies):
+            return False
+        return True
+
+
+def to_domain_info(doc_id: str, domain_data: dict) -> dict:
+    return {
+        'id': doc_id,
+        'name': domain_data.get('name', ''),
+        'description': domain_data.get('description', '')
+    }
+
+
+def to_article_response(article_data: dict, domain_info: dict) -> dict:
+    """The article shape returned by the news endpoints"""
+    return {
+        'id': article_data.get('id', ''),
+        'title': article_data.get('title', ''),
+        'description': article_data.get('description', ''),
+        'domain': domain_info,
+        'companies': article_data.get('companies', []),
+        'source': article_data.get('source', ''),
+        'source_url': article_data.get('source_url', ''),
+        'sentiment_numeric': article_data.get('sentiment_numeric', 0),
+        'sentiment_result': article_data.get('sentiment_result', {}),
+        'sentiment_sublabel': article_data.get('sentiment_sublabel', ''),
+        'timestamp': article_data.get('timestamp', 0)
+    }
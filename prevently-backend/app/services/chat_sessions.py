@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from app.services.cache import TTLCache
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for history budgeting"""
+    return max(1, len(text or "") // 4)
+
+
+class ChatSession:
+    def __init__(self, session_id: Optional[str] = None, messages: Optional[List[dict]] = None,
+                 summary: str = "", updated_at: Optional[float] = None):
+        self.id = session_id or uuid.uuid4().hex
+        self.messages = messages or []
+        self.summary = summary
+        self.updated_at = updated_at or time.time()
+        self.summarizing = False
+        self.lock = threading.Lock()
+
+    def append(self, role: str, content: str):
+        self.messages.append({"role": role, "content": content})
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "messages": self.messages,
+            "summary": self.summary,
+            "updated_at": self.updated_at,
+        }
+
+    def load(self, data: dict):
+        self.messages = data.get("messages") or []
+        self.summary = data.get("summary") or ""
+        self.updated_at = data.get("updated_at") or self.updated_at
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: dict) -> "ChatSession":
+        return cls(session_id, data.get("messages") or [], data.get("summary") or "", data.get("updated_at"))
+
+
+def split_history(messages: List[dict], budget_tokens: int) -> Tuple[List[dict], List[dict]]:
+    """Split history into (overflow, recent) so ``recent`` fits the token budget.
+
+    ``recent`` always starts with a user turn, as the Messages API requires.
+    """
+    used = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        cost = estimate_tokens(messages[i]["content"])
+        if used + cost > budget_tokens:
+            break
+        used += cost
+        start = i
+    while start < len(messages) and messages[start]["role"] != "user":
+        start += 1
+    return messages[:start], messages[start:]
+
+
+class ChatSessionStore:
+    """Bounded in-memory session store with an optional Firestore backend.
+
+    Sessions live in an LRU/TTL cache; with a ``db`` they are also written to
+    ``collection`` so they survive restarts and are shared between workers.
+    With a ``db`` every ``get`` re-reads the stored copy into the cached
+    session, so a worker never continues from turns another worker has
+    already replaced.
+    """
+
+    def __init__(self, db=None, max_sessions: int = 1000, ttl: float = 24 * 60 * 60,
+                 collection: str = "chat_sessions"):
+        self.db = db
+        self.collection = collection
+        self._sessions = TTLCache(maxsize=max_sessions, ttl=ttl)
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        session = self._sessions.get(session_id)
+        if self.db is not None:
+            doc = self.db.collection(self.collection).document(session_id).get()
+            if doc.exists:
+                if session is None:
+                    session = ChatSession.from_dict(session_id, doc.to_dict())
+                    self._sessions.set(session_id, session)
+                else:
+                    session.load(doc.to_dict())
+        return session
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        session = self.get(session_id) if session_id else None
+        if session is None:
+            session = ChatSession(session_id)
+            self._sessions.set(session.id, session)
+        return session
+
+    def save(self, session: ChatSession):
+        self._sessions.set(session.id, session)
+        if self.db is not None:
+            self.db.collection(self.collection).document(session.id).set(session.to_dict())
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id)
+        if self.db is not None:
+            self.db.collection(self.collection).document(session_id).delete()
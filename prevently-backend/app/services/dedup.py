@@ -0,0 +1,128 @@
+import hashlib
+import random
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TRUNCATION_MARKER = re.compile(r"\s*(?:…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Split text into lowercase word n-grams, ignoring NewsAPI truncation markers"""
+    if not isinstance(text, str):
+        return set()
+    text = _TRUNCATION_MARKER.sub("", text)
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two MinHash signatures"""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingles(text, self.shingle_size)
+        ]
+        if not hashes:
+            return None
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+
+class LSHIndex:
+    def __init__(self, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def add(self, key: str, signature: Tuple[int, ...]):
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        found = set()
+        for band, band_key in self._band_keys(signature):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+
+class DuplicateClusterer:
+    """Groups near-duplicate articles around the first copy seen of each story.
+
+    Only cluster representatives are indexed, so every later copy is compared
+    against the LSH candidates of its band buckets and linked to the most
+    similar representative above ``threshold``.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, shingle_size: int = 3):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.index = LSHIndex(num_perm=num_perm, bands=bands)
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def find_representative(self, signature: Tuple[int, ...]) -> Optional[str]:
+        best_key, best_score = None, self.threshold
+        for key in self.index.candidates(signature):
+            score = estimate_similarity(signature, self._signatures[key])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def signature_of(self, key: str) -> Optional[Tuple[int, ...]]:
+        return self._signatures.get(key)
+
+    def add_representative(self, key: str, signature: Tuple[int, ...]):
+        self._signatures[key] = signature
+        self.index.add(key, signature)
+
+    def assign(self, key: str, text: str) -> Optional[str]:
+        """Return the representative ``key`` duplicates, or register it as a new one"""
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        representative = self.find_representative(signature)
+        if representative is not None:
+            return representative
+        self.add_representative(key, signature)
+        return None
+
+    def cluster(self, items: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+        clusters: Dict[str, List[str]] = {}
+        for key, text in items:
+            representative = self.assign(key, text)
+            if representative is None:
+                clusters[key] = []
+            else:
+                clusters[representative].append(key)
+        return clusters
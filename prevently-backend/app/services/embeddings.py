@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def article_text(article: dict) -> str:
+    return f"{article.get('title') or ''}. {article.get('description') or ''}".strip(' .')
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder; a dependency-free stand-in for tests and local runs"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[str]:
+        words = _TOKEN.findall(text.lower())
+        yield from words
+        yield from (f"{a} {b}" for a, b in zip(words, words[1:]))
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                vectors[row, digest % self.dim] += 1.0 if (digest >> 63) else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEncoder:
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def load_encoder(name: str):
+    if name == "hashing":
+        return HashingEncoder()
+    return SentenceTransformerEncoder(name)
+
+
+class VectorStore:
+    """Append-only float32 matrix in a memory-mapped file, plus the article id of each row.
+
+    The file grows in chunks and is re-mapped on growth. ``meta.json`` is
+    replaced atomically after every append, and readers in other processes
+    pick up new rows through ``refresh``. Only a ``writable`` store creates,
+    extends or writes the files; readers map them with ``mode="r"``.
+    """
+
+    GROWTH_ROWS = 16_384
+
+    def __init__(self, directory: str, dim: int, writable: bool = False):
+        self.directory = directory
+        self.dim = dim
+        self.writable = writable
+        self.matrix_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+        if writable:
+            os.makedirs(directory, exist_ok=True)
+        self.count = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.meta: dict = {}
+        self._ids_offset = 0
+        self._matrix: Optional[np.memmap] = None
+        self._meta_mtime = None
+        self.refresh()
+
+    def _read_meta(self) -> dict:
+        if not os.path.exists(self.meta_path):
+            return {"dim": self.dim, "count": 0}
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _check_writable(self):
+        if not self.writable:
+            raise PermissionError(f"Vector store at {self.directory} is read-only")
+
+    def write_meta(self, **fields):
+        self._check_writable()
+        self.meta.update({"dim": self.dim, "count": self.count}, **fields)
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime = os.stat(self.meta_path).st_mtime_ns
+
+    def _map(self, capacity: int):
+        if not self.writable:
+            rows = os.path.getsize(self.matrix_path) // (self.dim * 4) if os.path.exists(self.matrix_path) else 0
+            self._matrix = (np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+                            if rows else np.zeros((0, self.dim), dtype=np.float32))
+            return
+        if not os.path.exists(self.matrix_path) or os.path.getsize(self.matrix_path) < capacity * self.dim * 4:
+            with open(self.matrix_path, "ab") as f:
+                f.truncate(capacity * self.dim * 4)
+        rows = os.path.getsize(self.matrix_path) // (self.dim * 4)
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def refresh(self) -> bool:
+        """Pick up rows appended by another process; returns True if anything changed"""
+        mtime = os.stat(self.meta_path).st_mtime_ns if os.path.exists(self.meta_path) else None
+        if mtime == self._meta_mtime and self._matrix is not None:
+            return False
+        meta = self._read_meta()
+        if meta.get("dim", self.dim) != self.dim:
+            raise ValueError(f"Vector store at {self.directory} has dim {meta['dim']}, expected {self.dim}")
+        count = meta.get("count", 0)
+        if count > self.count:
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                f.seek(self._ids_offset)
+                for _ in range(count - self.count):
+                    article_id = f.readline().rstrip("\n")
+                    self.rows[article_id] = len(self.ids)
+                    self.ids.append(article_id)
+                self._ids_offset = f.tell()
+            self.count = count
+        self.meta = meta
+        if self._matrix is None or self._matrix.shape[0] < max(self.count, 1):
+            self._map(max(self.count, 1))
+        self._meta_mtime = mtime
+        return True
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self.count]
+
+    def vector(self, article_id: str) -> Optional[np.ndarray]:
+        row = self.rows.get(article_id)
+        return None if row is None else np.array(self._matrix[row])
+
+    def append(self, ids: List[str], vectors: np.ndarray) -> int:
+        """Store new vectors, skipping ids already present; returns how many were added"""
+        self._check_writable()
+        new = [(article_id, vector) for article_id, vector in zip(ids, vectors) if article_id not in self.rows]
+        if not new:
+            return 0
+        needed = self.count + len(new)
+        if needed > self._matrix.shape[0]:
+            self._matrix.flush()
+            self._map(needed + self.GROWTH_ROWS)
+
+        start = self.count
+        self._matrix[start:needed] = np.stack([vector for _, vector in new]).astype(np.float32)
+        self._matrix.flush()
+        with open(self.ids_path, "a", encoding="utf-8") as f:
+            for article_id, _ in new:
+                f.write(article_id + "\n")
+            self._ids_offset = f.tell()
+        for offset, (article_id, _) in enumerate(new):
+            self.ids.append(article_id)
+            self.rows[article_id] = start + offset
+        self.count = needed
+        self.write_meta()
+        return len(new)
+
+
+class IVFIndex:
+    """Inverted-file ANN index over a ``VectorStore``.
+
+    Rows are assigned to the nearest of ``nlist`` k-means centroids and a
+    query only scores the rows in its ``nprobe`` closest lists, plus any rows
+    not assigned yet. Centroids and assignments are versioned files named in
+    ``meta.json``, so readers never pair one version's centroids with
+    another's assignments. Only a ``writable`` index trains or assigns.
+    """
+
+    def __init__(self, store: VectorStore, nlist: int = 1024, nprobe: int = 8,
+                 train_size: int = 50_000, writable: bool = False):
+        self.store = store
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.writable = writable
+        self.version = None
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self._assigned = 0
+        self.load()
+
+    def _paths(self, version: int) -> Tuple[str, str]:
+        return (os.path.join(self.store.directory, f"centroids-{version}.npy"),
+                os.path.join(self.store.directory, f"assignments-{version}.i32"))
+
+    def load(self):
+        version = self.store.meta.get("ivf_version")
+        if version is None:
+            return
+        centroids_path, assignments_path = self._paths(version)
+        if version != self.version:
+            self.centroids = np.load(centroids_path)
+            self.lists = [[] for _ in range(len(self.centroids))]
+            self._assigned = 0
+            self.version = version
+        if os.path.exists(assignments_path):
+            labels = np.fromfile(assignments_path, dtype=np.int32, offset=self._assigned * 4)
+            labels = labels[:max(0, self.store.count - self._assigned)]
+            for offset, list_id in enumerate(labels.tolist()):
+                self.lists[list_id].append(self._assigned + offset)
+            self._assigned += len(labels)
+        self.assign_pending()
+
+    def train(self, iterations: int = 10, seed: int = 0):
+        matrix = self.store.matrix
+        nlist = min(self.nlist, max(1, int(np.sqrt(len(matrix)))))
+        rng = np.random.default_rng(seed)
+        sample = matrix[np.sort(rng.choice(len(matrix), size=min(len(matrix), self.train_size), replace=False))]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        version = (self.version or 0) + 1
+        centroids_path, _ = self._paths(version)
+        np.save(centroids_path, centroids)
+        self.centroids = centroids
+        self.lists = [[] for _ in range(nlist)]
+        self._assigned = 0
+        self.version = version
+        self.assign_pending()
+        self.store.write_meta(ivf_version=version, ivf_trained_on=self.store.count)
+        for stale_path in self._paths(version - 2):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+    def assign_pending(self):
+        if not self.writable or self.centroids is None or self._assigned >= self.store.count:
+            return
+        rows = self.store.matrix[self._assigned:self.store.count]
+        labels = np.argmax(rows @ self.centroids.T, axis=1).astype(np.int32)
+        with open(self._paths(self.version)[1], "ab") as f:
+            labels.tofile(f)
+        for offset, list_id in enumerate(labels.tolist()):
+            self.lists[list_id].append(self._assigned + offset)
+        self._assigned = self.store.count
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        self.store.append(ids, vectors)
+        trained_on = self.store.meta.get("ivf_trained_on", 0) if self.centroids is not None else 0
+        if self.store.count >= min(self.train_size, self.nlist * 40) and self.store.count >= 4 * trained_on:
+            self.train()
+        else:
+            self.assign_pending()
+
+    def search(self, query: np.ndarray, k: int = 10, exclude: Optional[set] = None) -> List[Tuple[str, float]]:
+        matrix = self.store.matrix
+        if not len(matrix):
+            return []
+        unassigned = np.arange(min(self._assigned, len(matrix)), len(matrix))
+        if self.centroids is None:
+            candidates = unassigned
+        else:
+            probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            assigned = np.fromiter((row for list_id in probe for row in self.lists[list_id]), dtype=np.int64)
+            candidates = np.concatenate([assigned, unassigned])
+        if not len(candidates):
+            return []
+        scores = matrix[candidates] @ query
+        limit = min(len(candidates), k + len(exclude or ()))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            article_id = self.store.ids[candidates[i]]
+            if exclude and article_id in exclude:
+                continue
+            results.append((article_id, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+
+class EmbeddingIndex:
+    """Encodes articles at ingest time and answers related-article and text queries.
+
+    The ingest process opens the index ``writable``; API workers open it
+    read-only and map the same files, refreshing when ``meta.json`` changes.
+    """
+
+    def __init__(self, directory: str, encoder, nlist: int = 1024, nprobe: int = 8, writable: bool = False):
+        self.encoder = encoder
+        self.store = VectorStore(directory, encoder.dim, writable=writable)
+        self.index = IVFIndex(self.store, nlist=nlist, nprobe=nprobe, writable=writable)
+        self._lock = threading.Lock()
+        self._pending: List[dict] = []
+
+    def refresh(self):
+        with self._lock:
+            if self.store.refresh():
+                self.index.load()
+
+    def add_articles(self, articles: List[dict]):
+        articles = [a for a in articles if a.get('id') and a['id'] not in self.store.rows]
+        if not articles:
+            return
+        vectors = self.encoder.encode([article_text(a) for a in articles])
+        with self._lock:
+            self.index.add([a['id'] for a in articles], vectors)
+
+    def record(self, article: dict):
+        self._pending.append(article)
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        self.add_articles(pending)
+
+    def related(self, article_id: str, k: int = 10) -> Optional[List[Tuple[str, float]]]:
+        self.refresh()
+        vector = self.store.vector(article_id)
+        if vector is None:
+            return None
+        return self.index.search(vector, k, exclude={article_id})
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        self.refresh()
+        query = self.encoder.encode([text])[0]
+        return self.index.search(query, k)
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+from dataclasses import replace
+from typing import Iterable, Iterator
+
+from app.clients import DESCENDING
+from app.services.articles import ArticleFilters, parse_companies
+
+EXPORT_COLUMNS = [
+    'id', 'title', 'description', 'domain', 'companies', 'source', 'source_url',
+    'sentiment_numeric', 'sentiment_label', 'sentiment_score', 'sentiment_sublabel', 'timestamp'
+]
+
+# Firestore allows at most 10 values in an "in" filter; larger domain sets are filtered client side.
+_MAX_IN_VALUES = 10
+
+
+def build_query(db, filters: ArticleFilters, collection: str = 'news_datastore'):
+    query = db.collection(collection)
+    if len(filters.domains) == 1:
+        query = query.where('domain', '==', filters.domains[0])
+    elif 1 < len(filters.domains) <= _MAX_IN_VALUES:
+        query = query.where('domain', 'in', filters.domains)
+    if filters.date_from is not None:
+        query = query.where('timestamp', '>=', filters.date_from)
+    if filters.date_to is not None:
+        query = query.where('timestamp', '<=', filters.date_to)
+    return query.order_by('timestamp', direction=DESCENDING)
+
+
+def to_export_row(article_data: dict) -> dict:
+    sentiment_result = article_data.get('sentiment_result') or {}
+    return {
+        'id': article_data.get('id', ''),
+        'title': article_data.get('title', ''),
+        'description': article_data.get('description', ''),
+        'domain': article_data.get('domain', ''),
+        'companies': parse_companies(article_data.get('companies', [])),
+        'source': article_data.get('source', ''),
+        'source_url': article_data.get('source_url', ''),
+        'sentiment_numeric': float(article_data.get('sentiment_numeric', 0) or 0),
+        'sentiment_label': sentiment_result.get('label', ''),
+        'sentiment_score': float(sentiment_result.get('score', 0) or 0),
+        'sentiment_sublabel': article_data.get('sentiment_sublabel', ''),
+        'timestamp': int(article_data.get('timestamp', 0) or 0),
+    }
+
+
+def iter_articles(db, filters: ArticleFilters, page_size: int = 500, archive=None) -> Iterator[dict]:
+    """Yield matching articles page by page using Firestore cursors.
+
+    Only one page of snapshots is held at a time, so memory use does not grow
+    with the size of the export. With an ``ArticleArchive``, Firestore is only
+    read from the archive horizon on and older articles follow from the
+    archive, still newest first.
+    """
+    horizon = archive.archived_before() if archive is not None else None
+    if horizon is None:
+        yield from _iter_firestore(db, filters, page_size)
+        return
+    if filters.date_to is None or filters.date_to >= horizon:
+        yield from _iter_firestore(db, replace(filters, date_from=max(filters.date_from or horizon, horizon)), page_size)
+    if archive.covers(filters.date_from):
+        yield from archive.iter_rows(filters)
+
+
+def _iter_firestore(db, filters: ArticleFilters, page_size: int) -> Iterator[dict]:
+    query = build_query(db, filters)
+    last_doc = None
+    while True:
+        page_query = query.limit(page_size)
+        if last_doc is not None:
+            page_query = page_query.start_after(last_doc)
+
+        count = 0
+        for doc in page_query.stream():
+            count += 1
+            last_doc = doc
+            row = to_export_row(doc.to_dict())
+            if filters.matches(row['domain'], row['companies'], row['sentiment_numeric'], row['timestamp']):
+                yield row
+
+        if count < page_size:
+            return
+
+
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def iter_csv(rows: Iterable[dict], flush_every: int = 500) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow({**row, 'companies': ';'.join(row['companies'])})
+        if i % flush_every == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands Parquet bytes back as they are produced"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.string()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('domain', pa.string()),
+        ('companies', pa.list_(pa.string())),
+        ('source', pa.string()),
+        ('source_url', pa.string()),
+        ('sentiment_numeric', pa.float64()),
+        ('sentiment_label', pa.string()),
+        ('sentiment_score', pa.float64()),
+        ('sentiment_sublabel', pa.string()),
+        ('timestamp', pa.int64()),
+    ])
+
+
+def iter_parquet(rows: Iterable[dict], row_group_size: int = 5000) -> Iterator[bytes]:
+    """Encode rows as Parquet, emitting one row group at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd', use_dictionary=['domain', 'source', 'sentiment_label', 'sentiment_sublabel'])
+
+    columns = {name: [] for name in schema.names}
+    pending = 0
+    for row in rows:
+        for name in schema.names:
+            columns[name].append(row[name])
+        pending += 1
+        if pending == row_group_size:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            columns = {name: [] for name in schema.names}
+            pending = 0
+            yield sink.drain()
+
+    if pending:
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (iter_csv, 'text/csv', 'csv'),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def export_articles(db, filters: ArticleFilters, export_format: str, archive=None) -> Iterator[bytes]:
+    encoder = EXPORT_FORMATS[export_format][0]
+    return encoder(iter_articles(db, filters, archive=archive))
@@ -0,0 +1,236 @@
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.ingest import ArticleIngestor, CANDIDATE_LABELS, sentiment_to_numeric
+
+BACKENDS = ("fp32", "int8", "onnx")
+
+DEFAULT_MODELS = {
+    "sentiment": "nlptown/bert-base-multilingual-uncased-sentiment",
+    "ner": "dslim/bert-base-NER",
+    "domain": "facebook/bart-large-mnli",
+}
+
+_TASK_HEADS = {
+    "sentiment-analysis": "sequence",
+    "zero-shot-classification": "sequence",
+    "ner": "token",
+}
+
+_ORT_MODEL_CLASSES = {
+    "sequence": "ORTModelForSequenceClassification",
+    "token": "ORTModelForTokenClassification",
+}
+
+
+def load_model(model_name: str, head: str, backend: str = "fp32", onnx_dir: str = "data/onnx"):
+    """Load a tokenizer and a ``sequence`` or ``token`` classification model for the given backend.
+
+    ``int8`` applies PyTorch dynamic quantization to every ``nn.Linear``.
+    ``onnx`` exports the model through optimum on first use and reloads the
+    export from ``onnx_dir`` afterwards.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if backend == "onnx":
+        try:
+            import optimum.onnxruntime as ort
+        except ImportError:
+            raise ImportError("The onnx backend needs optimum with onnxruntime: pip install 'optimum[onnxruntime]'")
+
+        model_class = getattr(ort, _ORT_MODEL_CLASSES[head])
+        export_dir = os.path.join(onnx_dir, model_name.replace("/", "--"))
+        if os.path.exists(os.path.join(export_dir, "model.onnx")):
+            return model_class.from_pretrained(export_dir), tokenizer
+        model = model_class.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+        return model, tokenizer
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoModelForTokenClassification
+
+    model_class = AutoModelForSequenceClassification if head == "sequence" else AutoModelForTokenClassification
+    model = model_class.from_pretrained(model_name).eval()
+    if backend == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model, tokenizer
+
+
+class ZeroShotClassifier:
+    """NLI zero-shot classification that scores every candidate label in one forward pass.
+
+    The transformers pipeline tokenizes and runs each premise/hypothesis pair
+    on its own. Here the hypothesis token ids are built once per label set
+    and joined to the premise ids, so all pairs for an article go through
+    the model as a single padded batch. NLI models are cross-encoders, so
+    the pairs themselves still have to be encoded together. Results have the
+    pipeline's ``{"sequence", "labels", "scores"}`` shape.
+    """
+
+    def __init__(self, model, tokenizer, hypothesis_template: str = "This example is {}."):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.hypothesis_template = hypothesis_template
+        self.max_length = min(tokenizer.model_max_length, 1024)
+        self.pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        self.entailment_id = next(
+            (index for label, index in model.config.label2id.items() if label.lower().startswith("entail")), -1
+        )
+        self._special_tokens = tokenizer.num_special_tokens_to_add(pair=True)
+        self._hypotheses: Dict[tuple, List[List[int]]] = {}
+
+    def hypothesis_ids(self, candidate_labels: Sequence[str]) -> List[List[int]]:
+        key = tuple(candidate_labels)
+        ids = self._hypotheses.get(key)
+        if ids is None:
+            ids = [
+                self.tokenizer(self.hypothesis_template.format(label), add_special_tokens=False)["input_ids"]
+                for label in candidate_labels
+            ]
+            self._hypotheses[key] = ids
+        return ids
+
+    def encode(self, sequence: str, candidate_labels: Sequence[str]) -> List[List[int]]:
+        """Premise/hypothesis pairs, truncating only the premise like the pipeline does"""
+        premise = self.tokenizer(sequence, add_special_tokens=False)["input_ids"]
+        rows = []
+        for hypothesis in self.hypothesis_ids(candidate_labels):
+            budget = max(0, self.max_length - self._special_tokens - len(hypothesis))
+            rows.append(self.tokenizer.build_inputs_with_special_tokens(premise[:budget], hypothesis))
+        return rows
+
+    def _entailment_logits(self, rows: List[List[int]]) -> np.ndarray:
+        import torch
+
+        width = max(len(row) for row in rows)
+        input_ids = torch.full((len(rows), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = torch.tensor(row, dtype=torch.long)
+            attention_mask[i, :len(row)] = 1
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        return logits[:, self.entailment_id].float().numpy()
+
+    def classify(self, sequence: str, candidate_labels: Sequence[str]) -> dict:
+        logits = self._entailment_logits(self.encode(sequence, candidate_labels))
+        scores = np.exp(logits - logits.max())
+        scores /= scores.sum()
+        order = np.argsort(-scores)
+        return {
+            "sequence": sequence,
+            "labels": [candidate_labels[i] for i in order],
+            "scores": scores[order].tolist(),
+        }
+
+    def __call__(self, sequences, candidate_labels: Sequence[str]):
+        if isinstance(candidate_labels, str):
+            candidate_labels = [label.strip() for label in candidate_labels.split(",") if label.strip()]
+        if isinstance(sequences, str):
+            return self.classify(sequences, candidate_labels)
+        return [self.classify(sequence, candidate_labels) for sequence in sequences]
+
+
+def build_pipeline(task: str, model_name: str, backend: str = "fp32", onnx_dir: str = "data/onnx", **kwargs):
+    """A callable with the same input and output shape as ``transformers.pipeline(task, model_name)``"""
+    model, tokenizer = load_model(model_name, _TASK_HEADS[task], backend, onnx_dir)
+    if task == "zero-shot-classification":
+        return ZeroShotClassifier(model, tokenizer)
+
+    from transformers import pipeline
+
+    return pipeline(task, model=model, tokenizer=tokenizer, **kwargs)
+
+
+def load_enrichment_pipelines(backend: str = "fp32", models: Optional[Dict[str, str]] = None,
+                              onnx_dir: str = "data/onnx") -> dict:
+    """Sentiment, NER and domain models as ``ArticleIngestor`` keyword arguments"""
+    models = {**DEFAULT_MODELS, **(models or {})}
+    return {
+        "sentiment_pipeline": build_pipeline("sentiment-analysis", models["sentiment"], backend, onnx_dir),
+        "ner_pipeline": build_pipeline("ner", models["ner"], backend, onnx_dir, grouped_entities=True),
+        "domain_classifier": build_pipeline("zero-shot-classification", models["domain"], backend, onnx_dir),
+    }
+
+
+def load_reference_pipelines(models: Optional[Dict[str, str]] = None) -> dict:
+    """The notebook's full-precision transformers pipelines, used as the parity baseline"""
+    from transformers import pipeline
+
+    models = {**DEFAULT_MODELS, **(models or {})}
+    return {
+        "sentiment_pipeline": pipeline("sentiment-analysis", model=models["sentiment"]),
+        "ner_pipeline": pipeline("ner", model=models["ner"], grouped_entities=True),
+        "domain_classifier": pipeline("zero-shot-classification", model=models["domain"]),
+    }
+
+
+def run_enrichment(pipelines: dict, texts: List[str]) -> dict:
+    """Per-text enrichment outputs and per-stage seconds, using the ingest code paths"""
+    ingestor = ArticleIngestor(None, **pipelines)
+    outputs = {"labels": [], "sentiment": [], "companies": [], "domain": []}
+    seconds = {"sentiment": 0.0, "ner": 0.0, "domain": 0.0}
+    for text in texts:
+        started = time.perf_counter()
+        result = pipelines["sentiment_pipeline"](text[:512])[0]
+        seconds["sentiment"] += time.perf_counter() - started
+        outputs["labels"].append(result["label"])
+        outputs["sentiment"].append(sentiment_to_numeric(result))
+
+        started = time.perf_counter()
+        outputs["companies"].append(set(ingestor.extract_companies(text)))
+        seconds["ner"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        outputs["domain"].append(ingestor.extract_domain(text))
+        seconds["domain"] += time.perf_counter() - started
+    outputs["seconds"] = seconds
+    return outputs
+
+
+def parity_report(texts: List[str], backend: str, models: Optional[Dict[str, str]] = None, onnx_dir: str = "data/onnx") -> dict:
+    """Compare a backend's enrichment outputs and stage timings against the fp32 pipelines"""
+    texts = [text for text in texts if text and text.strip()]
+    if not texts:
+        raise ValueError("Parity check needs at least one non-empty text")
+
+    reference = run_enrichment(load_reference_pipelines(models), texts)
+    candidate = run_enrichment(load_enrichment_pipelines(backend, models, onnx_dir), texts)
+
+    def mean(values):
+        values = list(values)
+        return round(sum(values) / len(values), 4)
+
+    def jaccard(a: set, b: set) -> float:
+        return 1.0 if not a and not b else len(a & b) / len(a | b)
+
+    def pairs(key: str):
+        return zip(reference[key], candidate[key])
+
+    return {
+        "backend": backend,
+        "articles": len(texts),
+        "candidate_labels": len(CANDIDATE_LABELS),
+        "sentiment_label_agreement": mean(a == b for a, b in pairs("labels")),
+        "sentiment_mean_abs_delta": mean(abs(a - b) for a, b in pairs("sentiment")),
+        "sentiment_max_abs_delta": round(max(abs(a - b) for a, b in pairs("sentiment")), 4),
+        "companies_exact_match": mean(a == b for a, b in pairs("companies")),
+        "companies_mean_jaccard": mean(jaccard(a, b) for a, b in pairs("companies")),
+        "domain_agreement": mean(a == b for a, b in pairs("domain")),
+        "seconds_per_article": {
+            stage: {
+                "fp32": round(reference["seconds"][stage] / len(texts), 4),
+                backend: round(candidate["seconds"][stage] / len(texts), 4),
+            }
+            for stage in reference["seconds"]
+        },
+    }
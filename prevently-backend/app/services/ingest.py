@@ -0,0 +1,265 @@
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional
+
+from app.services.dedup import DuplicateClusterer
+
+LABEL_TO_VALUE = {
+    "1 star": -1.0,
+    "2 stars": -0.5,
+    "3 stars": 0.0,
+    "4 stars": 0.5,
+    "5 stars": 1.0
+}
+
+DAY_MILLIS = 24 * 60 * 60 * 1000
+
+# Firestore allows at most 10 values in an "in" filter.
+_MAX_IN_VALUES = 10
+
+CANDIDATE_LABELS = [
+    "technology", "finance", "healthcare", "energy", "industrials", "consumer_discretionary",
+    "materials", "communication_services", "consumer_staples", "utilities", "real_estate"
+]
+
+
+def classify_subinterval(score):
+    if score <= -0.7:
+        return "Panic"
+    elif score <= -0.4:
+        return "Risk"
+    elif score <= -0.1:
+        return "Mildly negative sentiment"
+    elif score < 0.1:
+        return "Stable outlook"
+    elif score < 0.4:
+        return "Mildly optimistic sentiment"
+    elif score < 0.7:
+        return "Growth"
+    else:
+        return "Strong confidence"
+
+
+def clean_text(text):
+    if not isinstance(text, str):
+        return ""
+
+    from bs4 import BeautifulSoup
+
+    text = BeautifulSoup(text, "html.parser").get_text(separator=" ")
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[\r\n\t]+", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"/[a-zA-Z]+/", " ", text)
+    text = text.strip()
+
+    return text
+
+
+def sentiment_to_numeric(result: dict) -> float:
+    return LABEL_TO_VALUE[result["label"]] * result["score"]
+
+
+def to_epoch_millis(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+    return 0
+
+
+def normalize_raw_article(raw: dict) -> dict:
+    """Flatten a NewsAPI article (or an already flattened row) into the ingest shape"""
+    source = raw.get("source", "")
+    if isinstance(source, dict):
+        source = source.get("name", "")
+    return {
+        "id": raw.get("id") or str(uuid.uuid4()),
+        "timestamp": to_epoch_millis(raw.get("publishedAt", raw.get("timestamp"))),
+        "title": raw.get("title") or "",
+        "description": raw.get("description") or "",
+        "content": clean_text(raw.get("content") or ""),
+        "source": source or "",
+        "source_url": raw.get("url", raw.get("source_url")) or "",
+    }
+
+
+class ArticleIngestor:
+    """Enriches raw articles and writes them to ``news_datastore``.
+
+    Near-duplicates are detected before inference: only cluster representatives
+    go through the sentiment, NER and domain models, and every other copy is
+    recorded on its representative's ``duplicates`` list instead of becoming a
+    document of its own. Stored articles are then passed to each listener's
+    optional ``prepare`` as a batch, then to ``record`` one by one, followed
+    by a single ``flush``.
+
+    Representatives keep their MinHash signature in ``minhash``. On its first
+    run an ingestor indexes the articles of the last ``seed_days``, so copies
+    of stories stored by earlier runs are linked instead of stored again, and
+    articles whose URL is already stored are skipped outright.
+    """
+
+    def __init__(
+        self,
+        db,
+        sentiment_pipeline: Callable,
+        ner_pipeline: Callable,
+        domain_classifier: Callable,
+        clusterer: Optional[DuplicateClusterer] = None,
+        collection: str = "news_datastore",
+        listeners: Optional[List] = None,
+        seed_days: int = 7,
+    ):
+        self.db = db
+        self.sentiment_pipeline = sentiment_pipeline
+        self.ner_pipeline = ner_pipeline
+        self.domain_classifier = domain_classifier
+        self.clusterer = clusterer or DuplicateClusterer()
+        self.collection = collection
+        self.listeners = listeners or []
+        self.seed_days = seed_days
+        self._seeded = False
+        self._known_urls = set()
+
+    def seed_clusterer(self):
+        """Index recently stored representatives and the URLs they already cover"""
+        since = int(time.time() * 1000) - self.seed_days * DAY_MILLIS
+        query = (self.db.collection(self.collection).where('timestamp', '>=', since)
+                 .select(['minhash', 'source_url', 'duplicates']))
+        for doc in query.stream():
+            data = doc.to_dict()
+            self._known_urls.add(data.get('source_url'))
+            self._known_urls.update(link.get('source_url') for link in data.get('duplicates') or [])
+            if data.get('minhash'):
+                self.clusterer.add_representative(doc.id, tuple(data['minhash']))
+        self._known_urls.discard(None)
+        self._known_urls.discard('')
+        self._seeded = True
+
+    def stored_urls(self, urls: List[str]) -> set:
+        """Which of ``urls`` already belong to a stored article, whatever its age"""
+        urls = sorted({url for url in urls if url} - self._known_urls)
+        found = set()
+        for start in range(0, len(urls), _MAX_IN_VALUES):
+            chunk = urls[start:start + _MAX_IN_VALUES]
+            query = self.db.collection(self.collection).where('source_url', 'in', chunk).select(['source_url'])
+            found.update(doc.to_dict().get('source_url') for doc in query.stream())
+        return found | self._known_urls
+
+    def dedup_text(self, article: dict) -> str:
+        return article["content"] or f"{article['title']} {article['description']}"
+
+    def extract_companies(self, text: str) -> List[str]:
+        if not text.strip():
+            return []
+        entities = self.ner_pipeline(text)
+        return [e["word"] for e in entities if e["entity_group"] == "ORG"]
+
+    def extract_domain(self, text: str) -> str:
+        text = re.sub(r"http\S+", "", text)
+        if not text.strip():
+            return "unknown"
+        result = self.domain_classifier(text[:512], CANDIDATE_LABELS)
+        return result["labels"][0].lower().replace(" ", "_")
+
+    def enrich(self, article: dict) -> dict:
+        text = article["content"] or article["description"] or article["title"]
+        sentiment_result = self.sentiment_pipeline(text[:512])[0]
+        sentiment = sentiment_to_numeric(sentiment_result)
+        article.update({
+            "sentiment_result": sentiment_result,
+            "sentiment_numeric": sentiment,
+            "sentiment_sublabel": classify_subinterval(sentiment),
+            "companies": self.extract_companies(text),
+            "domain": self.extract_domain(text),
+            "duplicates": [],
+            "duplicate_count": 0,
+        })
+        return article
+
+    def to_document(self, article: dict) -> dict:
+        return {key: value for key, value in article.items() if key != "content"}
+
+    def duplicate_link(self, article: dict) -> dict:
+        return {
+            "title": article["title"],
+            "source": article["source"],
+            "source_url": article["source_url"],
+            "timestamp": article["timestamp"],
+        }
+
+    def ingest(self, raw_articles: Iterable[dict]) -> dict:
+        from firebase_admin import firestore
+
+        collection = self.db.collection(self.collection)
+        stored = {}
+        pending_links = {}
+        skipped = 0
+
+        if not self._seeded:
+            self.seed_clusterer()
+        articles = [normalize_raw_article(raw) for raw in raw_articles]
+        seen_urls = self.stored_urls([article["source_url"] for article in articles])
+
+        for article in articles:
+            if article["source_url"] and article["source_url"] in seen_urls:
+                skipped += 1
+                continue
+            seen_urls.add(article["source_url"])
+            representative = self.clusterer.assign(article["id"], self.dedup_text(article))
+
+            if representative is None:
+                signature = self.clusterer.signature_of(article["id"])
+                stored[article["id"]] = self.enrich(article)
+                stored[article["id"]]["minhash"] = list(signature) if signature else []
+            elif representative in stored:
+                stored[representative]["duplicates"].append(self.duplicate_link(article))
+                stored[representative]["duplicate_count"] += 1
+            else:
+                pending_links.setdefault(representative, []).append(self.duplicate_link(article))
+
+        batch = self.db.batch()
+        writes = 0
+        for article_id, article in stored.items():
+            batch.set(collection.document(article_id), self.to_document(article))
+            writes += 1
+            if writes % 400 == 0:
+                batch.commit()
+                batch = self.db.batch()
+
+        for representative, links in pending_links.items():
+            batch.update(collection.document(representative), {
+                "duplicates": firestore.ArrayUnion(links),
+                "duplicate_count": firestore.Increment(len(links)),
+            })
+            writes += 1
+            if writes % 400 == 0:
+                batch.commit()
+                batch = self.db.batch()
+        batch.commit()
+
+        in_time_order = sorted(stored.values(), key=lambda a: a["timestamp"])
+        for listener in self.listeners:
+            prepare = getattr(listener, 'prepare', None)
+            if prepare is not None:
+                prepare(in_time_order)
+            for article in in_time_order:
+                listener.record(article)
+            listener.flush()
+
+        duplicates = sum(a["duplicate_count"] for a in stored.values())
+        duplicates += sum(len(links) for links in pending_links.values())
+        self._known_urls.update(seen_urls)
+        self._known_urls.discard('')
+        return {
+            "stored": len(stored),
+            "duplicates_linked": duplicates,
+            "skipped": skipped,
+            "articles": list(stored.values()),
+        }
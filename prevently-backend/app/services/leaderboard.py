@@ -0,0 +1,256 @@
+import heapq
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.services.articles import parse_companies
+
+LEADERBOARD_METRICS = ("mentions", "negative", "swing")
+
+
+def day_of(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary that also carries a sentiment sum per item.
+
+    ``count`` overestimates the true number of mentions by at most ``error``;
+    ``sentiment_sum`` only covers the ``count - error`` mentions actually seen
+    while the item was being tracked.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self.counters: Dict[str, List[float]] = {}
+
+    def add(self, item: str, sentiment: float, weight: int = 1):
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+            counter[2] += sentiment * weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0, sentiment * weight]
+        else:
+            evicted = min(self.counters, key=lambda key: self.counters[key][0])
+            min_count = self.counters.pop(evicted)[0]
+            self.counters[item] = [min_count + weight, min_count, sentiment * weight]
+
+    def floor(self) -> float:
+        """Upper bound on the count of any item this summary does not track"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+    @classmethod
+    def combine(cls, summaries: Iterable["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """Mergeable Space-Saving: an item missing from a summary gets that summary's floor as count and error.
+
+        The result is truncated to ``capacity`` once, after every summary has
+        been added, so ``count - error <= true count <= count`` still holds.
+        """
+        summaries = list(summaries)
+        floors = [summary.floor() for summary in summaries]
+        total_floor = sum(floors)
+        combined: Dict[str, List[float]] = {}
+        for summary, floor in zip(summaries, floors):
+            for key, (count, error, sentiment_sum) in summary.counters.items():
+                entry = combined.setdefault(key, [0, 0, 0.0, 0])
+                entry[0] += count
+                entry[1] += error
+                entry[2] += sentiment_sum
+                entry[3] += floor
+        for entry in combined.values():
+            missing = total_floor - entry.pop()
+            entry[0] += missing
+            entry[1] += missing
+        merged = cls(capacity)
+        merged.counters = dict(heapq.nlargest(capacity, combined.items(), key=lambda kv: kv[1][0]))
+        return merged
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        return SpaceSaving.combine([self, other], max(self.capacity, other.capacity))
+
+    def stats(self, item: str) -> dict:
+        count, error, sentiment_sum = self.counters[item]
+        observed = count - error
+        return {
+            'company': item,
+            'mention_count': int(count),
+            'error': int(error),
+            'avg_sentiment': round(sentiment_sum / observed, 3) if observed else 0.0,
+            'observed_mentions': int(observed),
+        }
+
+    def to_list(self) -> List[dict]:
+        return [
+            {'company': key, 'count': count, 'error': error, 'sentiment_sum': sentiment_sum}
+            for key, (count, error, sentiment_sum) in self.counters.items()
+        ]
+
+    @classmethod
+    def from_list(cls, items: Iterable[dict], capacity: int = 200) -> "SpaceSaving":
+        summary = cls(capacity)
+        for entry in items:
+            summary.counters[entry['company']] = [entry['count'], entry['error'], entry['sentiment_sum']]
+        return summary
+
+
+class CompanyLeaderboard:
+    """Per-day, per-domain heavy-hitter summaries of company mentions.
+
+    Articles are folded in as they are ingested; window queries merge the daily
+    summaries instead of rescanning ``news_datastore``. Each day is stored as a
+    single ``company_leaderboard`` document so a 30 day window costs 30 reads,
+    and closed days stay cached in memory.
+    """
+
+    def __init__(self, db=None, capacity: int = 200, collection: str = 'company_leaderboard',
+                 max_cached_days: int = 400, refresh_seconds: int = 60):
+        self.db = db
+        self.capacity = capacity
+        self.collection = collection
+        self.max_cached_days = max_cached_days
+        self.refresh_seconds = refresh_seconds
+        self._days: "OrderedDict[str, Dict[str, SpaceSaving]]" = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}
+        self._dirty = set()
+
+    def _day(self, day: str) -> Dict[str, SpaceSaving]:
+        summaries = self._days.get(day)
+        if summaries is None:
+            summaries = self._days[day] = {}
+        self._days.move_to_end(day)
+        return summaries
+
+    def record(self, article: dict):
+        companies = parse_companies(article.get('companies', []))
+        if not companies:
+            return
+        day = day_of(article.get('timestamp', 0))
+        domain = article.get('domain', '') or 'unknown'
+        if day not in self._days:
+            self._days[day] = self.load_days([day]).get(day, {})
+        summaries = self._day(day)
+        summary = summaries.get(domain)
+        if summary is None:
+            summary = summaries[domain] = SpaceSaving(self.capacity)
+        sentiment = article.get('sentiment_numeric', 0) or 0
+        for company in set(companies):
+            summary.add(company, sentiment)
+        self._dirty.add(day)
+
+    def flush(self):
+        if self.db is None or not self._dirty:
+            return
+        batch = self.db.batch()
+        writes = 0
+        for day in sorted(self._dirty):
+            batch.set(self.db.collection(self.collection).document(day), {
+                'day': day,
+                'domains': {domain: summary.to_list() for domain, summary in self._days[day].items()},
+            })
+            self._loaded_at[day] = time.time()
+            writes += 1
+            if writes % 400 == 0:
+                batch.commit()
+                batch = self.db.batch()
+        batch.commit()
+        self._dirty.clear()
+        self._evict()
+
+    def _evict(self):
+        while len(self._days) > self.max_cached_days:
+            day = next(iter(self._days))
+            if day in self._dirty:
+                break
+            self._days.popitem(last=False)
+            self._loaded_at.pop(day, None)
+
+    def _is_stale(self, day: str, today: str) -> bool:
+        if day not in self._loaded_at:
+            return True
+        if day < (date.fromisoformat(today) - timedelta(days=1)).isoformat():
+            return False
+        return time.time() - self._loaded_at[day] > self.refresh_seconds
+
+    def load_days(self, days: List[str]) -> Dict[str, Dict[str, SpaceSaving]]:
+        """Summaries for ``days``, reading stale or missing ones; returned even if evicted from the cache"""
+        loaded = {day: self._days[day] for day in days if day in self._days}
+        if self.db is not None:
+            today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            missing = [day for day in days if day not in self._dirty and self._is_stale(day, today)]
+            refs = [self.db.collection(self.collection).document(day) for day in missing]
+            now = time.time()
+            for doc in self.db.get_all(refs) if refs else []:
+                summaries = {}
+                if doc.exists:
+                    for domain, items in (doc.to_dict().get('domains') or {}).items():
+                        summaries[domain] = SpaceSaving.from_list(items, self.capacity)
+                self._days[doc.id] = summaries
+                self._loaded_at[doc.id] = now
+                loaded[doc.id] = summaries
+        for day in loaded:
+            self._days.move_to_end(day)
+        self._evict()
+        return loaded
+
+    def window(self, days: List[str], domain: Optional[str] = None, chunk_days: int = 100) -> SpaceSaving:
+        """Merge the summaries of ``days``, a chunk at a time so windows longer than the cache stay complete"""
+        merged = SpaceSaving(self.capacity)
+        for start in range(0, len(days), chunk_days):
+            loaded = self.load_days(days[start:start + chunk_days])
+            chunk = [
+                summary
+                for summaries in loaded.values()
+                for summary_domain, summary in summaries.items()
+                if not domain or summary_domain == domain
+            ]
+            merged = SpaceSaving.combine([merged] + chunk, self.capacity)
+        return merged
+
+    def top(self, days: int = 30, domain: Optional[str] = None, k: int = 20,
+            metric: str = 'mentions', min_mentions: int = 3, end: Optional[str] = None) -> List[dict]:
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Unknown leaderboard metric: {metric}")
+        end_day = date.fromisoformat(end) if end else datetime.now(timezone.utc).date()
+        window_days = [(end_day - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+        if metric == 'swing':
+            half = len(window_days) // 2
+            earlier = self.window(window_days[:half], domain)
+            later = self.window(window_days[half:], domain)
+            results = []
+            for company in later.counters.keys() & earlier.counters.keys():
+                before, after = earlier.stats(company), later.stats(company)
+                if min(before['observed_mentions'], after['observed_mentions']) < min_mentions:
+                    continue
+                results.append({
+                    'company': company,
+                    'mention_count': before['mention_count'] + after['mention_count'],
+                    'avg_sentiment_before': before['avg_sentiment'],
+                    'avg_sentiment_after': after['avg_sentiment'],
+                    'sentiment_swing': round(after['avg_sentiment'] - before['avg_sentiment'], 3),
+                })
+            return heapq.nlargest(k, results, key=lambda r: abs(r['sentiment_swing']))
+
+        summary = self.window(window_days, domain)
+        if metric == 'mentions':
+            return [summary.stats(company) for company in heapq.nlargest(k, summary.counters, key=lambda c: summary.counters[c][0])]
+
+        candidates = [summary.stats(company) for company in summary.counters]
+        candidates = [c for c in candidates if c['observed_mentions'] >= min_mentions]
+        return heapq.nsmallest(k, candidates, key=lambda c: c['avg_sentiment'])
+
+    def rebuild(self, articles: Iterable[dict]):
+        self._days.clear()
+        self._loaded_at.clear()
+        for article in articles:
+            day = day_of(article.get('timestamp', 0))
+            if day not in self._days:
+                self._days[day] = {}
+                self._loaded_at[day] = time.time()
+            self.record(article)
+        self._dirty.update(self._days.keys())
+        self.flush()
@@ -0,0 +1,95 @@
+import re
+from datetime import date
+
+SENTIMENT_VALUES = {"positive", "neutral", "negative"}
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|(AND|OR|NOT)\b|(\w+):("[^"]*"|[^\s()]+))', re.IGNORECASE)
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def tokenize(query: str):
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if not match:
+            raise QuerySyntaxError(f"Unexpected input at position {position}: {query[position:position + 20]!r}")
+        lparen, rparen, operator, field, value = match.groups()
+        if lparen:
+            tokens.append(("(", None))
+        elif rparen:
+            tokens.append((")", None))
+        elif operator:
+            tokens.append((operator.upper(), None))
+        else:
+            tokens.append(("FILTER", (field.lower(), value)))
+        position = match.end()
+    return tokens
+
+
+def validate_filter(field: str, value: str):
+    if field == "domain":
+        if not re.fullmatch(r"\w+", value):
+            raise QuerySyntaxError(f"Invalid domain: {value}")
+    elif field == "company":
+        if value.startswith('"'):
+            value = value[1:-1]
+        if not value.strip():
+            raise QuerySyntaxError("Empty company name")
+    elif field == "sentiment":
+        if not set(value.lower().split("|")) <= SENTIMENT_VALUES:
+            raise QuerySyntaxError(f"Invalid sentiment: {value}")
+    elif field == "date":
+        match = re.fullmatch(r"(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})", value)
+        if not match:
+            raise QuerySyntaxError(f"Invalid date range: {value}")
+        try:
+            start, end = date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+        except ValueError:
+            raise QuerySyntaxError(f"Invalid date range: {value}")
+        if start > end:
+            raise QuerySyntaxError(f"Date range is reversed: {value}")
+    else:
+        raise QuerySyntaxError(f"Unknown filter: {field}")
+
+
+def validate_query(query: str):
+    """Raise ``QuerySyntaxError`` unless ``query`` is a well-formed filter expression"""
+    tokens = tokenize(query)
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+
+    position = 0
+
+    def parse_term():
+        nonlocal position
+        if position < len(tokens) and tokens[position][0] == "NOT":
+            position += 1
+        if position >= len(tokens):
+            raise QuerySyntaxError("Unexpected end of query")
+        kind, value = tokens[position]
+        position += 1
+        if kind == "(":
+            parse_expression()
+            if position >= len(tokens) or tokens[position][0] != ")":
+                raise QuerySyntaxError("Unbalanced parentheses")
+            position += 1
+        elif kind == "FILTER":
+            validate_filter(*value)
+        else:
+            raise QuerySyntaxError(f"Unexpected {kind}")
+
+    def parse_expression():
+        nonlocal position
+        parse_term()
+        while position < len(tokens) and tokens[position][0] in ("AND", "OR"):
+            position += 1
+            parse_term()
+
+    parse_expression()
+    if position != len(tokens):
+        raise QuerySyntaxError(f"Unexpected {tokens[position][0]}")
@@ -0,0 +1,80 @@
+import re
+from typing import List
+
+from app.services.batching import MicroBatcher
+from app.services.ingest import classify_subinterval, clean_text, sentiment_to_numeric
+
+_WORD = re.compile(r"[a-z']+")
+
+_POSITIVE_WORDS = {
+    "gain", "gains", "growth", "grow", "beat", "beats", "record", "strong", "surge", "surges", "rally",
+    "profit", "profits", "rise", "rises", "up", "boost", "upgrade", "optimistic", "success", "win", "good",
+}
+_NEGATIVE_WORDS = {
+    "loss", "losses", "fall", "falls", "drop", "drops", "crash", "weak", "miss", "misses", "decline",
+    "cut", "cuts", "layoffs", "lawsuit", "fraud", "bankrupt", "bankruptcy", "down", "risk", "crisis", "bad",
+}
+
+
+class TransformersSentimentModel:
+    def __init__(self, model_name: str, backend: str = "fp32", onnx_dir: str = "data/onnx"):
+        from app.services.inference import build_pipeline
+
+        self.pipeline = build_pipeline("sentiment-analysis", model_name, backend, onnx_dir,
+                                       truncation=True, max_length=512)
+
+    def predict(self, texts: List[str]) -> List[dict]:
+        return self.pipeline(texts, batch_size=len(texts))
+
+
+class LexiconSentimentModel:
+    """Tiny word-list model with the same 1-5 star output as the BERT model; a stand-in for tests"""
+
+    def predict(self, texts: List[str]) -> List[dict]:
+        results = []
+        for text in texts:
+            words = _WORD.findall(text.lower())
+            positive = sum(word in _POSITIVE_WORDS for word in words)
+            negative = sum(word in _NEGATIVE_WORDS for word in words)
+            balance = (positive - negative) / max(positive + negative, 1)
+            stars = min(5, max(1, round(3 + 2 * balance)))
+            results.append({
+                "label": "1 star" if stars == 1 else f"{stars} stars",
+                "score": round(0.5 + abs(balance) / 2, 4),
+            })
+        return results
+
+
+def load_sentiment_model(name: str, backend: str = "fp32", onnx_dir: str = "data/onnx"):
+    if name == "lexicon":
+        return LexiconSentimentModel()
+    return TransformersSentimentModel(name, backend, onnx_dir)
+
+
+def score_result(result: dict) -> dict:
+    sentiment = sentiment_to_numeric(result)
+    return {
+        "sentiment_result": {"label": result["label"], "score": float(result["score"])},
+        "sentiment_numeric": sentiment,
+        "sentiment_sublabel": classify_subinterval(sentiment),
+    }
+
+
+class SentimentService:
+    """On-demand scoring with the notebook's sentiment mapping, micro-batched across requests"""
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5, max_queue: int = 1024):
+        self.model = model
+        self.batcher = MicroBatcher(self._score_batch, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms, max_queue=max_queue)
+
+    def _score_batch(self, texts: List[str]) -> List[dict]:
+        # Cleanup parses HTML, so it runs here on the batcher's worker thread rather than on the event loop
+        texts = [clean_text(text)[:512] for text in texts]
+        return [score_result(result) for result in self.model.predict(texts)]
+
+    async def score(self, text: str) -> dict:
+        return await self.batcher.submit(text)
+
+    def close(self):
+        self.batcher.close()
@@ -0,0 +1,356 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from app.clients import DESCENDING
+from app.services.articles import ArticleFilters, parse_companies, to_article_response, to_domain_info
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b"PRVSNAP1"
+HEADER = struct.Struct("<8sI")
+MANIFEST = "manifest.json"
+LATEST_NEWS_LIMIT = 500
+
+
+def encode_json(value) -> bytes:
+    """Serialize the way FastAPI's JSONResponse does, so cached bytes match live responses"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(directory: str, manifest: dict):
+    path = os.path.join(directory, MANIFEST)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SnapshotWriter:
+    """Collects pre-serialized JSON payloads and writes them as one snapshot file.
+
+    The file is a fixed header, a JSON index of ``key -> offset/length`` and
+    the payload bytes. List payloads also record where each item ends, so a
+    reader can serve any prefix of the list without re-serializing.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, dict] = {}
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    def _append(self, data: bytes) -> int:
+        offset = self._size
+        self._chunks.append(data)
+        self._size += len(data)
+        return offset
+
+    def add(self, key: str, value):
+        data = encode_json(value)
+        self.index[key] = {"offset": self._append(data), "length": len(data)}
+
+    def add_list(self, key: str, field: str, items: Sequence):
+        """Store ``{field: items}``"""
+        parts = [b"{" + encode_json(field) + b":["]
+        ends = []
+        length = len(parts[0])
+        for i, item in enumerate(items):
+            data = (b"," if i else b"") + encode_json(item)
+            parts.append(data)
+            length += len(data)
+            ends.append(length)
+        parts.append(b"]}")
+        data = b"".join(parts)
+        self.index[key] = {"offset": self._append(data), "length": len(data), "ends": ends}
+
+    def write(self, path: str):
+        index = encode_json(self.index)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(index)))
+            f.write(index)
+            for chunk in self._chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class MappedSnapshot:
+    def __init__(self, path: str, version: int, built_at: float):
+        self.version = version
+        self.built_at = built_at
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        self._data_start = HEADER.size + index_length
+        self.index = json.loads(self._map[HEADER.size:self._data_start])
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        start = self._data_start + entry["offset"]
+        return self._map[start:start + entry["length"]]
+
+    def get_list(self, key: str, limit: int) -> Optional[bytes]:
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        ends = entry["ends"]
+        if limit >= len(ends):
+            return self.get(key)
+        start = self._data_start + entry["offset"]
+        return self._map[start:start + ends[limit - 1]] + b"]}"
+
+
+class SnapshotReader:
+    """Serves payloads from the current snapshot, mapped read-only and shared by every worker.
+
+    The manifest is checked at most once per ``check_interval``; a new
+    version is mapped and swapped in whole, so a request never mixes two
+    versions. Snapshots older than ``max_age`` seconds are ignored and
+    callers fall back to live queries.
+    """
+
+    def __init__(self, directory: str, max_age: float, check_interval: float = 1.0):
+        self.directory = directory
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self._snapshot: Optional[MappedSnapshot] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[MappedSnapshot]:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            with self._lock:
+                if now - self._checked >= self.check_interval:
+                    self._checked = now
+                    self._reload()
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.built_at > self.max_age:
+            return None
+        return snapshot
+
+    def _reload(self):
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            return
+        if self._snapshot is not None and self._snapshot.version == manifest["version"]:
+            return
+        try:
+            self._snapshot = MappedSnapshot(os.path.join(self.directory, manifest["file"]),
+                                            manifest["version"], manifest["built_at"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        snapshot = self.current()
+        return None if snapshot is None else snapshot.get(key)
+
+    def get_list(self, key: str, limit: int) -> Optional[bytes]:
+        snapshot = self.current()
+        return None if snapshot is None else snapshot.get_list(key, limit)
+
+
+def company_names(companies) -> Iterator[str]:
+    for company in parse_companies(companies):
+        if company and len(company.strip()) > 1:
+            yield company.strip()
+
+
+def analytics_key(days: int, domain: Optional[str]) -> str:
+    return f"analytics:{days}:{domain or 'all'}"
+
+
+class SnapshotBuilder:
+    """Materializes the read-hot auth endpoints into snapshot files.
+
+    Covers ``/domains``, ``/news/latest``, ``/companies`` and the
+    ``/analytics/sentiment`` windows. With an ``archive``, companies and
+    windows reaching past its horizon include the archived articles, the
+    same way the live endpoints do. Only the worker holding the
+    ``leader.lock`` file lock builds; the others keep calling ``try_lead``
+    and one of them takes over if the leader exits.
+
+    A build reads only the articles of the longest window. The company list
+    is the previous build's set plus the companies in that window, with a
+    full ``news_datastore`` scan every ``companies_rescan_seconds`` to pick
+    up backfilled articles older than the window.
+    """
+
+    def __init__(self, db, directory: str, windows: Sequence[int] = (7, 30, 90), archive=None,
+                 companies_rescan_seconds: float = 24 * 60 * 60):
+        self.db = db
+        self.directory = directory
+        self.windows = sorted(set(windows))
+        self.archive = archive
+        self.companies_rescan_seconds = companies_rescan_seconds
+        self._archived_companies = (None, set())
+        self._companies: Optional[set] = None
+        self._companies_scanned_at = 0.0
+        self._lock_file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def try_lead(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            self._lock_file = True
+            return True
+        lock_file = open(os.path.join(self.directory, "leader.lock"), "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def close(self):
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None and lock_file is not True:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+    def archived_companies(self, horizon: int) -> set:
+        """Companies named in the archive, re-read only after a tiering run moves the horizon"""
+        version, companies = self._archived_companies
+        if version != horizon:
+            companies = set()
+            for row in self.archive.iter_rows(ArticleFilters(), columns=['companies']):
+                companies.update(company_names(row['companies'] or []))
+            self._archived_companies = (horizon, companies)
+        return companies
+
+    def _previous_companies(self):
+        """The company set and scan time of the published snapshot, so a new leader need not rescan"""
+        manifest = read_manifest(self.directory)
+        if not manifest or 'companies_scanned_at' not in manifest:
+            return None, 0.0
+        try:
+            payload = MappedSnapshot(os.path.join(self.directory, manifest['file']),
+                                     manifest['version'], manifest['built_at']).get('companies')
+            return set(json.loads(payload)['companies']), manifest['companies_scanned_at']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, 0.0
+
+    def stored_companies(self, recent: set) -> set:
+        """Companies in ``news_datastore``: the last known set plus ``recent``, fully rescanned when due"""
+        if self._companies is None:
+            self._companies, self._companies_scanned_at = self._previous_companies()
+        if self._companies is None or time.time() - self._companies_scanned_at > self.companies_rescan_seconds:
+            companies = set()
+            for doc in self.db.collection('news_datastore').select(['companies']).stream():
+                companies.update(company_names(doc.to_dict().get('companies', [])))
+            self._companies, self._companies_scanned_at = companies, time.time()
+        self._companies |= recent
+        return self._companies
+
+    def collect(self, now_ms: int) -> SnapshotWriter:
+        writer = SnapshotWriter()
+
+        domains = [to_domain_info(doc.id, doc.to_dict()) for doc in self.db.collection('domains').stream()]
+        domains.sort(key=lambda x: x['name'])
+        writer.add('domains', {"domains": domains})
+        domains_by_id = {domain['id']: domain for domain in domains}
+
+        latest = self.db.collection('news_datastore').order_by('timestamp', direction=DESCENDING)
+        articles = []
+        for doc in latest.limit(LATEST_NEWS_LIMIT).stream():
+            article_data = doc.to_dict()
+            domain_id = article_data.get('domain', '')
+            domain_info = domains_by_id.get(domain_id) or {'id': domain_id, 'name': domain_id, 'description': ''}
+            articles.append(to_article_response(article_data, domain_info))
+        writer.add_list('news_latest', 'articles', articles)
+
+        horizon = self.archive.archived_before() if self.archive is not None else None
+        cutoffs = {days: now_ms - days * 24 * 60 * 60 * 1000 for days in self.windows}
+        daily = {days: defaultdict(lambda: defaultdict(list)) for days in self.windows}
+
+        def add(timestamp: int, sentiment: float, domain: str):
+            windows = [days for days, cutoff in cutoffs.items() if timestamp >= cutoff]
+            if not windows:
+                return
+            date = datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d')
+            for days in windows:
+                daily[days]['all'][date].append(sentiment)
+                daily[days][domain][date].append(sentiment)
+
+        since = min(cutoffs.values(), default=now_ms)
+        if horizon is not None:
+            since = max(since, horizon)
+        recent = set()
+        fields = ['timestamp', 'sentiment_numeric', 'domain', 'companies']
+        for doc in self.db.collection('news_datastore').where('timestamp', '>=', since).select(fields).stream():
+            article_data = doc.to_dict()
+            recent.update(company_names(article_data.get('companies', [])))
+            add(article_data.get('timestamp', 0), article_data.get('sentiment_numeric', 0), article_data.get('domain', ''))
+
+        companies = set(self.stored_companies(recent))
+        if horizon is not None:
+            companies |= self.archived_companies(horizon)
+            earliest = min(cutoffs.values(), default=horizon)
+            if earliest < horizon:
+                columns = ['timestamp', 'sentiment_numeric', 'domain']
+                for row in self.archive.iter_rows(ArticleFilters(date_from=earliest), columns=columns):
+                    add(row['timestamp'], row['sentiment_numeric'], row['domain'])
+
+        writer.add('companies', {"companies": sorted(companies)})
+
+        for days in self.windows:
+            for domain in set(domains_by_id) | set(daily[days]) | {'all'}:
+                writer.add(analytics_key(days, domain), {"analytics": [
+                    {
+                        'date': date,
+                        'sentiment': round(sum(sentiments) / len(sentiments), 3),
+                        'article_count': len(sentiments)
+                    }
+                    for date, sentiments in sorted(daily[days][domain].items())
+                ]})
+        return writer
+
+    def build(self) -> int:
+        """Write a new snapshot version and publish it by swapping the manifest"""
+        built_at = time.time()
+        writer = self.collect(int(built_at * 1000))
+
+        previous = read_manifest(self.directory)
+        version = int(built_at * 1000)
+        if previous and previous.get("version", 0) >= version:
+            version = previous["version"] + 1
+        filename = f"snapshot-{version}.bin"
+        writer.write(os.path.join(self.directory, filename))
+        write_manifest(self.directory, {"version": version, "file": filename, "built_at": built_at,
+                                        "companies_scanned_at": self._companies_scanned_at})
+
+        keep = {filename, previous.get("file") if previous else None}
+        for name in os.listdir(self.directory):
+            if name.startswith("snapshot-") and name.endswith(".bin") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        return version
@@ -0,0 +1,136 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.services.cache import TTLCache
+
+
+class UsernameTaken(Exception):
+    pass
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class UsernameService:
+    """Username to email resolution and availability checks for the ``usernames`` collection.
+
+    Resolved emails are kept in an LRU cache. A Bloom filter over every stored
+    username answers most availability checks without a read: a miss means
+    the name is free, while a hit is confirmed against Firestore. Every
+    ``refresh_seconds`` the filter adds the names created since its last sync
+    (by ``created_at``), so names registered through other workers show up
+    within that interval; ``reserve`` relies on Firestore's ``create`` to
+    reject duplicates either way.
+    """
+
+    def __init__(self, db, collection: str = 'usernames', cache_size: int = 10_000,
+                 cache_ttl: float = 60 * 60, expected_usernames: int = 100_000,
+                 refresh_seconds: float = 30, clock_skew_seconds: float = 60):
+        self.db = db
+        self.collection = collection
+        self.expected_usernames = expected_usernames
+        self.refresh_seconds = refresh_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+        self._emails = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._bloom: Optional[BloomFilter] = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(username: str) -> str:
+        return username.strip().lower()
+
+    def _doc(self, username: str):
+        return self.db.collection(self.collection).document(username)
+
+    def rebuild(self):
+        started = time.time()
+        bloom = BloomFilter(self.expected_usernames)
+        for doc in self.db.collection(self.collection).select([]).stream():
+            bloom.add(doc.id)
+        with self._lock:
+            self._bloom = bloom
+            self._synced_at = started
+
+    def refresh(self):
+        """Add the names created since the last sync, allowing for clock skew against the server timestamps"""
+        if self._bloom is None:
+            self.rebuild()
+            return
+        started = time.time()
+        since = datetime.fromtimestamp(self._synced_at - self.clock_skew_seconds, tz=timezone.utc)
+        query = self.db.collection(self.collection).where('created_at', '>=', since).select([])
+        usernames = [doc.id for doc in query.stream()]
+        with self._lock:
+            for username in usernames:
+                self._bloom.add(username)
+            self._synced_at = max(self._synced_at, started)
+
+    def resolve_email(self, username: str) -> Optional[str]:
+        username = self.normalize(username)
+        email = self._emails.get(username)
+        if email is not None:
+            return email
+        doc = self._doc(username).get()
+        if not doc.exists:
+            return None
+        email = doc.to_dict().get('email')
+        if email:
+            self._emails.set(username, email)
+        return email
+
+    def is_available(self, username: str) -> bool:
+        username = self.normalize(username)
+        if self._emails.get(username) is not None:
+            return False
+        if self._bloom is not None and time.time() - self._synced_at > self.refresh_seconds:
+            self.refresh()
+        if self._bloom is not None and username not in self._bloom:
+            return True
+        return not self._doc(username).get().exists
+
+    def reserve(self, username: str, email: str):
+        """Atomically claim ``username`` for ``email``, raising ``UsernameTaken`` if it exists"""
+        from firebase_admin import firestore
+        from google.api_core.exceptions import AlreadyExists
+
+        username = self.normalize(username)
+        try:
+            self._doc(username).create({
+                'email': email,
+                'username': username,
+                'created_at': firestore.SERVER_TIMESTAMP
+            })
+        except AlreadyExists:
+            raise UsernameTaken(username)
+
+        self._emails.set(username, email)
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(username)
+
+    def release(self, username: str):
+        username = self.normalize(username)
+        self._doc(username).delete()
+        self._emails.pop(username)
@@ -0,0 +1,36 @@
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from app.config import Config
+from app.services.archive import ArticleArchive
+
+
+def retention_horizon(days: int) -> int:
+    """Start of the UTC day ``days`` ago, so re-runs on the same day use the same horizon"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int((today - timedelta(days=days)).timestamp() * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move articles past the retention horizon into the Parquet archive")
+    parser.add_argument("--retention-days", type=int, default=Config.ARCHIVE_RETENTION_DAYS)
+    parser.add_argument("--keep-hot", action="store_true",
+                        help="Archive without deleting the archived articles from Firestore")
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH), {
+            'projectId': Config.FIREBASE_PROJECT_ID
+        })
+
+    archive = ArticleArchive(Config.ARCHIVE_DIR)
+    result = archive.tier(firestore.client(), retention_horizon(args.retention_days), delete=not args.keep_hot)
+    print(f"Archived {result['archived']} articles, deleted {result['deleted']} from Firestore, "
+          f"archive horizon {result['archived_before']}")
+
+
+if __name__ == "__main__":
+    main()
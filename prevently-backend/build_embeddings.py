@@ -0,0 +1,50 @@
+import os
+
+import firebase_admin
+from dotenv import load_dotenv
+from firebase_admin import credentials, firestore
+
+from app.config import Config
+from app.services.archive import ArticleArchive
+from app.services.articles import ArticleFilters
+from app.services.embeddings import EmbeddingIndex, load_encoder
+
+load_dotenv()
+
+if not firebase_admin._apps:
+    service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY_PATH")
+    if service_account_path and os.path.exists(service_account_path):
+        cred = credentials.Certificate(service_account_path)
+    else:
+        exit(1)
+
+    firebase_admin.initialize_app(cred, {
+        'projectId': os.getenv("FIREBASE_PROJECT_ID")
+    })
+
+db = firestore.client()
+
+
+def iter_articles():
+    """Every stored article, archived ones included"""
+    for doc in db.collection('news_datastore').select(['title', 'description']).stream():
+        article = doc.to_dict()
+        article['id'] = doc.id
+        yield article
+    yield from ArticleArchive(Config.ARCHIVE_DIR).iter_rows(ArticleFilters(), columns=['id', 'title', 'description'])
+
+
+def build_embeddings(batch_size: int = 512):
+    """Encode every stored article that is not in the embeddings index yet"""
+    index = EmbeddingIndex(Config.EMBEDDINGS_DIR, load_encoder(Config.EMBEDDINGS_MODEL), writable=True)
+    batch = []
+    for article in iter_articles():
+        batch.append(article)
+        if len(batch) == batch_size:
+            index.add_articles(batch)
+            batch = []
+    index.add_articles(batch)
+
+
+if __name__ == "__main__":
+    build_embeddings()
@@ -0,0 +1,47 @@
+import os
+
+import firebase_admin
+from dotenv import load_dotenv
+from firebase_admin import credentials, firestore
+
+from app.config import Config
+from app.services.archive import ArticleArchive
+from app.services.articles import ArticleFilters
+from app.services.leaderboard import CompanyLeaderboard
+
+load_dotenv()
+
+if not firebase_admin._apps:
+    service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY_PATH")
+    if service_account_path and os.path.exists(service_account_path):
+        cred = credentials.Certificate(service_account_path)
+    else:
+        exit(1)
+
+    firebase_admin.initialize_app(cred, {
+        'projectId': os.getenv("FIREBASE_PROJECT_ID")
+    })
+
+db = firestore.client()
+
+
+def iter_history():
+    """Every stored article: Firestore from the archive horizon on, then the archive"""
+    archive = ArticleArchive(Config.ARCHIVE_DIR)
+    horizon = archive.archived_before()
+    query = db.collection('news_datastore')
+    if horizon is not None:
+        query = query.where('timestamp', '>=', horizon)
+    for doc in query.select(['timestamp', 'sentiment_numeric', 'domain', 'companies']).stream():
+        yield doc.to_dict()
+    yield from archive.iter_rows(ArticleFilters(), columns=['timestamp', 'sentiment_numeric', 'domain', 'companies'])
+
+
+def rebuild_leaderboard():
+    """Backfill the daily company summaries from the full news history"""
+    leaderboard = CompanyLeaderboard(db)
+    leaderboard.rebuild(iter_history())
+
+
+if __name__ == "__main__":
+    rebuild_leaderboard()
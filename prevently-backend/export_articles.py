@@ -0,0 +1,65 @@
+import argparse
+import os
+from datetime import datetime, timezone
+
+import firebase_admin
+from dotenv import load_dotenv
+from firebase_admin import credentials, firestore
+
+from app.config import Config
+from app.services.archive import ArticleArchive
+from app.services.articles import ArticleFilters
+from app.services.export import EXPORT_FORMATS, export_articles
+
+load_dotenv()
+
+
+def to_millis(date_str: str) -> int:
+    parsed = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream filtered news articles to a file")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--domain", action="append", default=[], dest="domains")
+    parser.add_argument("--company", action="append", default=[], dest="companies")
+    parser.add_argument("--date-from", help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--date-to", help="YYYY-MM-DD, exclusive")
+    parser.add_argument("--sentiment", choices=["all", "positive", "neutral", "negative"], default="all")
+    parser.add_argument("--sentiment-min", type=float)
+    parser.add_argument("--sentiment-max", type=float)
+    args = parser.parse_args()
+
+    if not firebase_admin._apps:
+        service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY_PATH")
+        if service_account_path and os.path.exists(service_account_path):
+            cred = credentials.Certificate(service_account_path)
+        else:
+            cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred, {
+            'projectId': os.getenv("FIREBASE_PROJECT_ID")
+        })
+
+    filters = ArticleFilters(
+        domains=args.domains,
+        companies=args.companies,
+        date_from=to_millis(args.date_from) if args.date_from else None,
+        date_to=to_millis(args.date_to) - 1 if args.date_to else None,
+        sentiment_filter=args.sentiment,
+        sentiment_min=args.sentiment_min,
+        sentiment_max=args.sentiment_max,
+    )
+
+    written = 0
+    with open(args.output, "wb") as f:
+        for chunk in export_articles(firestore.client(), filters, args.format,
+                                     archive=ArticleArchive(Config.ARCHIVE_DIR)):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"Wrote {written} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import json
+
+import firebase_admin
+import requests
+from firebase_admin import credentials, firestore
+
+from app.config import Config
+from app.services.alerts import SentimentAnomalyDetector
+from app.services.embeddings import EmbeddingIndex, load_encoder
+from app.services.inference import BACKENDS, load_enrichment_pipelines, parity_report
+from app.services.ingest import ArticleIngestor, normalize_raw_article
+from app.services.leaderboard import CompanyLeaderboard
+
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+
+
+def fetch_articles(query: str, pages: int, page_size: int = 100):
+    for page in range(1, pages + 1):
+        response = requests.get(NEWSAPI_URL, params={
+            "q": query,
+            "language": "en",
+            "pageSize": page_size,
+            "page": page,
+            "apiKey": Config.NEWSAPI_KEY,
+        }).json()
+        if response.get("status") != "ok" or "articles" not in response:
+            print("NewsAPI error:", response.get("message"))
+            return
+        yield from response["articles"]
+
+
+def build_ingestor(db, backend: str = "fp32") -> ArticleIngestor:
+    return ArticleIngestor(
+        db,
+        **load_enrichment_pipelines(backend, onnx_dir=Config.ONNX_DIR),
+        listeners=[
+            CompanyLeaderboard(db),
+            EmbeddingIndex(Config.EMBEDDINGS_DIR, load_encoder(Config.EMBEDDINGS_MODEL), writable=True),
+            SentimentAnomalyDetector(
+                db,
+                alpha=Config.ALERT_EWMA_ALPHA,
+                z_threshold=Config.ALERT_Z_THRESHOLD,
+                alert_sublabels=Config.ALERT_SUBLABELS,
+            ),
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, deduplicate, enrich and store news articles")
+    parser.add_argument("--query", default="economy OR politics OR technology")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default=Config.INFERENCE_BACKEND,
+                        help="Inference backend for the sentiment, NER and domain models")
+    parser.add_argument("--parity-check", type=int, metavar="N", default=0,
+                        help="Compare the backend against the fp32 pipelines on N fetched articles and exit")
+    args = parser.parse_args()
+
+    if args.parity_check:
+        articles = [normalize_raw_article(raw) for raw in fetch_articles(args.query, pages=1, page_size=args.parity_check)]
+        texts = [a["content"] or a["description"] or a["title"] for a in articles]
+        print(json.dumps(parity_report(texts, args.backend, onnx_dir=Config.ONNX_DIR), indent=2))
+        return
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(Config.FIREBASE_SERVICE_ACCOUNT_KEY_PATH), {
+            'projectId': Config.FIREBASE_PROJECT_ID
+        })
+
+    ingestor = build_ingestor(firestore.client(), args.backend)
+    result = ingestor.ingest(fetch_articles(args.query, args.pages))
+    print(f"Stored {result['stored']} articles, linked {result['duplicates_linked']} duplicates, "
+          f"skipped {result['skipped']} already stored")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import copy
+import itertools
+from datetime import datetime, timezone
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_OPERATORS = {
+    '==': lambda value, target: value == target,
+    '!=': lambda value, target: value != target,
+    '<': lambda value, target: value is not None and value < target,
+    '<=': lambda value, target: value is not None and value <= target,
+    '>': lambda value, target: value is not None and value > target,
+    '>=': lambda value, target: value is not None and value >= target,
+    'in': lambda value, target: value in target,
+    'array_contains': lambda value, target: isinstance(value, list) and target in value,
+}
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self._db = db
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def _store(self):
+        return self._db.data.setdefault(self._collection, {})
+
+    def get(self):
+        self._db.reads += 1
+        return FakeSnapshot(self, copy.deepcopy(self._store.get(self.id)))
+
+    def set(self, data, merge=False):
+        data = {key: datetime.now(timezone.utc) if type(value).__name__ == 'Sentinel' else value
+                for key, value in data.items()}
+        if merge and self.id in self._store:
+            self._store[self.id].update(copy.deepcopy(data))
+        else:
+            self._store[self.id] = copy.deepcopy(data)
+
+    def create(self, data):
+        if self.id in self._store:
+            from google.api_core.exceptions import AlreadyExists
+
+            raise AlreadyExists(self.id)
+        self.set(data)
+
+    def update(self, data):
+        if self.id not in self._store:
+            raise KeyError(self.id)
+        document = self._store[self.id]
+        for key, value in data.items():
+            transform = type(value).__name__
+            if transform == 'ArrayUnion':
+                current = document.setdefault(key, [])
+                current.extend(copy.deepcopy(item) for item in value.values if item not in current)
+            elif transform == 'Increment':
+                document[key] = document.get(key, 0) + value.value
+            else:
+                document[key] = copy.deepcopy(value)
+
+    def delete(self):
+        self._store.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=(), order=None, limit=None, cursor=None, fields=None):
+        self._db = db
+        self._collection = collection
+        self._filters = filters
+        self._order = order
+        self._limit = limit
+        self._cursor = cursor
+        self._fields = fields
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, order=self._order, limit=self._limit,
+                     cursor=self._cursor, fields=self._fields)
+        state.update(changes)
+        return FakeQuery(self._db, self._collection, **state)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(order=(field, direction))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot.id)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def stream(self):
+        items = [
+            (doc_id, data) for doc_id, data in self._db.data.get(self._collection, {}).items()
+            if all(_OPERATORS[op](data.get(field), value) for field, op, value in self._filters)
+        ]
+        if self._order is not None:
+            field, direction = self._order
+            items.sort(key=lambda item: (item[1].get(field) is None, item[1].get(field)),
+                       reverse=direction == "DESCENDING")
+        if self._cursor is not None:
+            ids = [doc_id for doc_id, _ in items]
+            items = items[ids.index(self._cursor) + 1:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        self._db.reads += len(items)
+        for doc_id, data in items:
+            if self._fields is not None:
+                data = {key: value for key, value in data.items() if key in self._fields}
+            yield FakeSnapshot(FakeDocument(self._db, self._collection, doc_id), copy.deepcopy(data))
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    _ids = itertools.count()
+
+    def document(self, doc_id=None):
+        return FakeDocument(self._db, self._collection, doc_id or f"auto-{next(self._ids)}")
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._operations = []
+
+    def _add(self, operation):
+        if len(self._operations) >= 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._operations.append(operation)
+
+    def set(self, reference, data, merge=False):
+        self._add(lambda: reference.set(data, merge=merge))
+
+    def update(self, reference, data):
+        self._add(lambda: reference.update(data))
+
+    def delete(self, reference):
+        self._add(reference.delete)
+
+    def commit(self):
+        self._db.commits += 1
+        for operation in self._operations:
+            operation()
+        self._operations = []
+
+
+class FakeFirestore:
+    """In-memory stand-in for the parts of the Firestore client the app uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.reads = 0
+        self.commits = 0
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, references):
+        return [reference.get() for reference in references]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture(autouse=True)
+def clear_module_caches():
+    from app.routers import auth
+
+    auth.domain_cache.clear()
+    yield
+    auth.domain_cache.clear()
@@ -0,0 +1,33 @@
+from app.services.alerts import SentimentAnomalyDetector
+
+
+def article(sentiment, domain="finance", companies=("Acme",)):
+    return {"id": "a", "title": "t", "timestamp": 0, "domain": domain,
+            "companies": list(companies), "sentiment_numeric": sentiment}
+
+
+def test_state_is_loaded_only_for_touched_keys(db):
+    detector = SentimentAnomalyDetector(db)
+    detector.record(article(0.5))
+    detector.flush()
+    db.data["anomaly_state"].update({f"other{i}": {"key": f"company:Other{i}"} for i in range(20)})
+
+    db.reads = 0
+    restored = SentimentAnomalyDetector(db)
+    batch = [article(0.1, companies=["Acme", "Beta"]) for _ in range(3)]
+    restored.prepare(batch)
+    for item in batch:
+        restored.record(item)
+
+    assert db.reads == 3
+    assert restored._states["company:Acme"].count == 4
+    assert restored._states["company:Beta"].count == 3
+
+
+def test_sharp_drop_raises_an_alert():
+    detector = SentimentAnomalyDetector(min_observations=5)
+    for i in range(20):
+        detector.record(article(0.5 + (0.05 if i % 2 else -0.05)))
+    alerts = detector.record(article(-0.9))
+    assert {alert["type"] for alert in alerts} >= {"zscore"}
+    assert {alert["scope"] for alert in alerts} == {"domain", "company"}
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import clients
+from app.main import create_app
+from app.services.archive import ArticleArchive
+from app.services.embeddings import EmbeddingIndex, HashingEncoder
+from app.services.sentiment import LexiconSentimentModel, SentimentService
+
+
+@pytest.fixture
+def client(db, tmp_path):
+    db.data["domains"] = {"finance": {"name": "Finance", "description": "Markets"}}
+    db.data["news_datastore"] = {
+        f"a{i}": {"id": f"a{i}", "title": f"Bank raises interest rates {i}", "description": "rates",
+                  "domain": "finance", "companies": ["Acme"], "timestamp": i}
+        for i in range(5)
+    }
+    index = EmbeddingIndex(str(tmp_path), HashingEncoder(dim=64), writable=True)
+    index.add_articles(list(db.data["news_datastore"].values()))
+    archive = ArticleArchive(str(tmp_path / "archive"))
+    archive.tier(db, 2)
+    app = create_app(eager_clients=False, warm_caches=False, refresh_snapshot=False, firestore=db,
+                     embedding_index=index, article_archive=archive,
+                     sentiment_service=SentimentService(LexiconSentimentModel()))
+    with TestClient(app) as test_client:
+        yield test_client
+    clients.close()
+
+
+def test_sentiment_scores_text(client):
+    response = client.post("/api/sentiment", json={"text": "Great growth and strong profit"})
+    assert response.status_code == 200
+    assert response.json()["sentiment_numeric"] > 0
+
+
+def test_sentiment_rejects_empty_text(client):
+    assert client.post("/api/sentiment", json={"text": "  "}).status_code == 400
+
+
+def test_semantic_search_returns_articles_with_similarity(client):
+    response = client.post("/auth/news/semantic", json={"query": "bank interest rates", "limit": 2})
+    assert response.status_code == 200
+    articles = response.json()["articles"]
+    assert len(articles) == 2
+    assert articles[0]["domain"]["name"] == "Finance"
+    assert "similarity" in articles[0]
+
+
+def test_semantic_search_includes_archived_articles(client):
+    response = client.post("/auth/news/semantic", json={"query": "bank interest rates", "limit": 5})
+    articles = {article["id"]: article for article in response.json()["articles"]}
+    assert set(articles) == {"a0", "a1", "a2", "a3", "a4"}
+    assert articles["a0"]["title"] == "Bank raises interest rates 0"
+    assert articles["a0"]["domain"]["name"] == "Finance"
+
+
+def test_related_for_unknown_article_is_404(client):
+    assert client.get("/auth/news/missing/related").status_code == 404
+
+
+def test_sentiment_text_is_cleaned_on_the_batch_worker():
+    seen = []
+
+    class RecordingModel(LexiconSentimentModel):
+        def predict(self, texts):
+            seen.append((threading.current_thread().name, list(texts)))
+            return super().predict(texts)
+
+    service = SentimentService(RecordingModel())
+    try:
+        result = asyncio.run(service.score("<p>Strong <b>growth</b></p>"))
+    finally:
+        service.close()
+
+    thread_name, texts = seen[0]
+    assert thread_name.startswith("micro-batcher")
+    assert "<" not in texts[0] and "growth" in texts[0]
+    assert result["sentiment_numeric"] > 0
@@ -0,0 +1,108 @@
+from app.services.archive import ArticleArchive
+from app.services.articles import ArticleFilters
+from app.services.export import iter_articles
+
+DAY = 24 * 60 * 60 * 1000
+NOW = 1_717_200_000_000
+
+
+def seed(db, count=60):
+    db.data["news_datastore"] = {
+        f"a{i}": {
+            "id": f"a{i}",
+            "title": f"Story {i}",
+            "description": "",
+            "content": f"Body {i}",
+            "domain": ["finance", "technology"][i % 2],
+            "companies": ["Acme"] if i % 3 == 0 else ["Beta"],
+            "source": "Wire",
+            "source_url": f"https://example.com/{i}",
+            "sentiment_numeric": (i % 5 - 2) / 2,
+            "sentiment_result": {"label": "3 stars", "score": 0.9},
+            "sentiment_sublabel": "Stable outlook",
+            "timestamp": NOW - i * DAY,
+            "duplicates": [],
+        }
+        for i in range(count)
+    }
+
+
+FILTERS = [
+    ArticleFilters(),
+    ArticleFilters(domains=["finance"], sentiment_filter="negative"),
+    ArticleFilters(companies=["Acme"], date_from=NOW - 45 * DAY, date_to=NOW - 10 * DAY),
+]
+
+
+def test_exports_match_before_and_after_tiering(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    before = [list(iter_articles(db, filters, page_size=7)) for filters in FILTERS]
+
+    result = archive.tier(db, NOW - 30 * DAY)
+    assert result["archived"] == 29
+    assert result["deleted"] == 29
+    assert len(db.data["news_datastore"]) == 31
+
+    after = [list(iter_articles(db, filters, page_size=7, archive=archive)) for filters in FILTERS]
+    assert after == before
+
+
+def test_tiering_again_is_a_no_op(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY)
+    assert archive.tier(db, NOW - 30 * DAY) == {"archived": 0, "deleted": 0, "archived_before": NOW - 30 * DAY}
+    assert sum(1 for _ in archive.iter_rows(ArticleFilters())) == 29
+
+
+def test_archive_keeps_content_and_duplicates(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY)
+    rows = list(archive.iter_rows(ArticleFilters(), columns=["title", "content", "duplicates"]))
+    assert rows[0] == {"title": "Story 31", "content": "Body 31", "duplicates": "[]"}
+
+
+def test_late_articles_below_the_horizon_are_archived_before_deletion(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY)
+    late = dict(db.data["news_datastore"]["a0"], id="late", title="Late upload", timestamp=NOW - 40 * DAY)
+    db.data["news_datastore"]["late"] = late
+
+    result = archive.tier(db, NOW - 30 * DAY)
+    assert (result["archived"], result["deleted"]) == (1, 1)
+    assert "late" not in db.data["news_datastore"]
+    titles = [row["title"] for row in archive.iter_rows(ArticleFilters(date_to=NOW - 39 * DAY), columns=["title"])]
+    assert titles.count("Late upload") == 1
+
+
+def test_interrupted_delete_does_not_archive_twice(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY, delete=False)
+
+    result = archive.tier(db, NOW - 30 * DAY)
+    assert (result["archived"], result["deleted"]) == (0, 29)
+    assert sum(1 for _ in archive.iter_rows(ArticleFilters())) == 29
+
+
+def test_rows_from_every_file_of_a_month_come_newest_first(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY)
+    db.data["news_datastore"]["late"] = dict(db.data["news_datastore"]["a0"], id="late", timestamp=NOW - 40 * DAY + 1)
+    archive.tier(db, NOW - 30 * DAY)
+
+    timestamps = [row["timestamp"] for row in archive.iter_rows(ArticleFilters(), columns=["timestamp"])]
+    assert len(timestamps) == 30
+    assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_find_returns_archived_rows_by_id(db, tmp_path):
+    seed(db)
+    archive = ArticleArchive(str(tmp_path))
+    archive.tier(db, NOW - 30 * DAY)
+    found = archive.find(["a40", "a5", "missing"], columns=["title"])
+    assert found == {"a40": {"id": "a40", "title": "Story 40"}}
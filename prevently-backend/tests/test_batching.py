@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.services.batching import MicroBatcher, QueueFull
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            batcher.close()
+
+    assert run(main()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    async def main():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=20)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        finally:
+            batcher.close()
+
+    assert run(main()) == list(range(7))
+    assert max(sizes) == 3 and sum(sizes) == 7
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def process(items):
+        raise RuntimeError("model failed")
+
+    async def main():
+        batcher = MicroBatcher(process, max_wait_ms=10)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            batcher.close()
+
+    assert all(isinstance(result, RuntimeError) for result in run(main()))
+
+
+def test_short_results_fail_the_whole_batch():
+    async def main():
+        batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=10)
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=5)
+        finally:
+            batcher.close()
+
+    assert all(isinstance(result, RuntimeError) for result in run(main()))
+
+
+def test_full_queue_rejects_new_items():
+    async def main():
+        batcher = MicroBatcher(lambda items: items, max_queue=1)
+        try:
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        finally:
+            batcher.close()
+
+    accepted, rejected = run(main())
+    assert accepted == 1
+    assert isinstance(rejected, QueueFull)
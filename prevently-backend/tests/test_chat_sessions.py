@@ -0,0 +1,42 @@
+from app.services.chat_sessions import split_history
+
+
+def message(role, tokens):
+    return {"role": role, "content": "x" * (tokens * 4)}
+
+
+def test_history_within_budget_is_kept():
+    messages = [message("user", 10), message("assistant", 10)]
+    assert split_history(messages, 100) == ([], messages)
+
+
+def test_oldest_turns_overflow_first():
+    messages = [message("user", 50), message("assistant", 50), message("user", 10), message("assistant", 10)]
+    overflow, recent = split_history(messages, 30)
+    assert overflow == messages[:2]
+    assert recent == messages[2:]
+
+
+def test_recent_starts_with_a_user_turn():
+    messages = [message("user", 50), message("assistant", 10), message("user", 10), message("assistant", 10)]
+    overflow, recent = split_history(messages, 30)
+    assert recent[0]["role"] == "user"
+    assert overflow + recent == messages
+    assert len(recent) == 2
+
+
+def test_firestore_sessions_are_shared_between_workers(db):
+    from app.services.chat_sessions import ChatSessionStore
+
+    first, second = ChatSessionStore(db), ChatSessionStore(db)
+    session = first.get_or_create()
+    session.append("user", "hello")
+    first.save(session)
+
+    other = second.get(session.id)
+    other.append("assistant", "hi")
+    other.append("user", "and now?")
+    second.save(other)
+
+    assert [m["content"] for m in first.get(session.id).messages] == ["hello", "hi", "and now?"]
+    assert first.get(session.id) is session
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import clients
+from app.main import create_app
+
+
+class FakeAnthropic:
+    def __init__(self):
+        self.calls = []
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text=f"reply {len(self.calls)}")])
+
+
+def chat_messages(anthropic_client):
+    """Messages of the last chat call, skipping the background summary calls"""
+    calls = [call for call in anthropic_client.calls if not call["messages"][0]["content"].startswith("Previous summary:")]
+    return [message["content"] for message in calls[-1]["messages"]]
+
+
+@pytest.fixture
+def anthropic_client():
+    return FakeAnthropic()
+
+
+@pytest.fixture
+def client(db, anthropic_client):
+    app = create_app(eager_clients=False, warm_caches=False, refresh_snapshot=False,
+                     firestore=db, anthropic=anthropic_client)
+    with TestClient(app) as test_client:
+        yield test_client
+    clients.close()
+
+
+def test_session_id_continues_the_conversation(client, anthropic_client):
+    session_id = client.post("/api/chat", json={"message": "first"}).json()["session_id"]
+    client.post("/api/chat", json={"message": "second", "session_id": session_id})
+
+    assert chat_messages(anthropic_client) == ["first", "reply 1", "second"]
+
+
+def test_unknown_session_continues_from_client_history(client, anthropic_client):
+    response = client.post("/api/chat", json={
+        "message": "and the outlook?",
+        "session_id": "started-on-another-worker",
+        "conversation_history": [
+            {"sender": "bot", "content": "Hi there!"},
+            {"sender": "user", "content": "How is finance doing?"},
+            {"sender": "bot", "content": "Mostly stable."},
+        ],
+    })
+
+    assert response.json()["session_id"] == "started-on-another-worker"
+    assert chat_messages(anthropic_client) == ["How is finance doing?", "Mostly stable.", "and the outlook?"]
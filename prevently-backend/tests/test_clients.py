@@ -0,0 +1,46 @@
+import threading
+import time
+
+from app.clients import Clients
+
+
+def test_slow_factory_does_not_block_other_names():
+    registry = Clients()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "model"
+
+    worker = threading.Thread(target=registry.get, args=("model", slow))
+    worker.start()
+    started.wait(5)
+
+    began = time.perf_counter()
+    assert registry.get("cheap", lambda: "ready") == "ready"
+    assert time.perf_counter() - began < 0.5
+
+    release.set()
+    worker.join(5)
+    assert registry.get("model") == "model"
+
+
+def test_each_name_is_built_once():
+    registry = Clients()
+    builds = []
+
+    def factory():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("shared", factory))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(builds) == 1
+    assert len({id(result) for result in results}) == 1
@@ -0,0 +1,44 @@
+from app.services.dedup import DuplicateClusterer, LSHIndex, MinHasher, estimate_similarity, shingles
+
+STORY = ("The central bank raised interest rates by a quarter point on Wednesday, "
+         "citing persistent inflation in services and a tight labour market across the region.")
+
+
+def test_shingles_ignore_truncation_marker():
+    assert shingles("rates rise again … [+1234 chars]") == shingles("rates rise again")
+
+
+def test_signature_of_empty_text_is_none():
+    assert MinHasher().signature("   ") is None
+
+
+def test_near_duplicates_share_a_representative():
+    clusterer = DuplicateClusterer()
+    clusters = clusterer.cluster([
+        ("a", STORY),
+        ("b", STORY + " Markets barely moved."),
+        ("c", "A new smartphone with a foldable screen goes on sale next month in three colours."),
+    ])
+    assert clusters == {"a": ["b"], "c": []}
+
+
+def test_lsh_finds_similar_signatures_only():
+    hasher = MinHasher()
+    index = LSHIndex()
+    original = hasher.signature(STORY)
+    index.add("a", original)
+    near = hasher.signature(STORY.replace("Wednesday", "Thursday"))
+    far = hasher.signature("Local football club wins the cup after a dramatic penalty shootout.")
+
+    assert estimate_similarity(original, near) > 0.6
+    assert "a" in index.candidates(near)
+    assert index.candidates(far) == set()
+
+
+def test_seeded_representative_is_matched():
+    first = DuplicateClusterer()
+    first.assign("stored", STORY)
+
+    later = DuplicateClusterer()
+    later.add_representative("stored", first.signature_of("stored"))
+    assert later.assign("new", STORY + " Markets barely moved.") == "stored"
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.services.embeddings import EmbeddingIndex, HashingEncoder, IVFIndex, VectorStore
+
+TOPICS = ["bank interest rates inflation", "smartphone chip launch", "oil gas pipeline energy", "hospital vaccine trial"]
+
+
+def articles(count):
+    return [{"id": f"a{i}", "title": f"{TOPICS[i % len(TOPICS)]} story {i}", "description": TOPICS[i % len(TOPICS)]}
+            for i in range(count)]
+
+
+def test_ivf_search_matches_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(400, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = IVFIndex(VectorStore(str(tmp_path), 16, writable=True), nlist=8, nprobe=8, writable=True)
+    index.add([f"v{i}" for i in range(len(vectors))], vectors)
+    assert index.centroids is not None
+
+    query = vectors[7]
+    exact = np.argsort(-(vectors @ query))[:5]
+    assert [article_id for article_id, _ in index.search(query, 5)] == [f"v{i}" for i in exact]
+
+
+def test_search_includes_rows_added_after_training(tmp_path):
+    encoder = HashingEncoder(dim=64)
+    index = EmbeddingIndex(str(tmp_path), encoder, nlist=4, writable=True)
+    index.add_articles(articles(200))
+    index.add_articles([{"id": "late", "title": "quantum computing breakthrough", "description": ""}])
+
+    assert index.search("quantum computing breakthrough", 1)[0][0] == "late"
+
+
+def test_reader_sees_writer_appends(tmp_path):
+    encoder = HashingEncoder(dim=64)
+    writer = EmbeddingIndex(str(tmp_path), encoder, nlist=4, writable=True)
+    writer.add_articles(articles(8))
+    reader = EmbeddingIndex(str(tmp_path), encoder, nlist=4)
+
+    writer.add_articles([{"id": "new", "title": "bank interest rates inflation", "description": "rates"}])
+    related = reader.related("a0", 3)
+    assert related is not None and "a0" not in dict(related)
+    assert reader.related("new", 1) is not None
+    assert reader.related("missing") is None
+
+
+def test_reader_maps_files_read_only(tmp_path):
+    encoder = HashingEncoder(dim=64)
+    missing = tmp_path / "missing"
+    reader = EmbeddingIndex(str(missing), encoder, nlist=4)
+    assert not missing.exists()
+    assert reader.search("bank interest rates") == []
+
+    writer = EmbeddingIndex(str(tmp_path), encoder, nlist=4, writable=True)
+    writer.add_articles(articles(8))
+    size = os.path.getsize(tmp_path / "vectors.f32")
+    reader = EmbeddingIndex(str(tmp_path), encoder, nlist=4)
+
+    assert reader.related("a0", 3)
+    assert os.path.getsize(tmp_path / "vectors.f32") == size
+    assert not reader.store.matrix.flags.writeable
+    with pytest.raises(PermissionError):
+        reader.add_articles([{"id": "new", "title": "bank interest rates", "description": ""}])
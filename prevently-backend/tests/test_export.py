@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import clients
+from app.main import create_app
+from app.services.articles import ArticleFilters
+from app.services.export import EXPORT_COLUMNS, iter_articles, iter_csv, iter_ndjson, iter_parquet
+
+
+def seed(db, count=12):
+    db.data["news_datastore"] = {
+        f"a{i}": {
+            "id": f"a{i}", "title": f"Story, \"{i}\"", "description": "", "domain": ["finance", "technology"][i % 2],
+            "companies": "Acme; Beta" if i % 3 == 0 else ["Beta"], "source": "Wire",
+            "source_url": f"https://example.com/{i}", "sentiment_numeric": (i % 5 - 2) / 2,
+            "sentiment_result": {"label": "3 stars", "score": 0.9}, "sentiment_sublabel": "Stable outlook",
+            "timestamp": 1000 + i,
+        }
+        for i in range(count)
+    }
+
+
+@pytest.fixture
+def rows(db):
+    seed(db)
+    return list(iter_articles(db, ArticleFilters(), page_size=5))
+
+
+@pytest.fixture
+def client(db):
+    seed(db)
+    app = create_app(eager_clients=False, warm_caches=False, refresh_snapshot=False, firestore=db)
+    with TestClient(app) as test_client:
+        yield test_client
+    clients.close()
+
+
+def test_iter_articles_pages_newest_first_and_filters(db, rows):
+    assert [row["timestamp"] for row in rows] == list(range(1011, 999, -1))
+    assert rows[-1]["companies"] == ["Acme", "Beta"]
+
+    finance = list(iter_articles(db, ArticleFilters(domains=["finance"], companies=["Acme"]), page_size=2))
+    assert [row["id"] for row in finance] == ["a6", "a0"]
+
+
+def test_encoders_round_trip(rows):
+    decoded = [json.loads(line) for line in b"".join(iter_ndjson(rows)).decode("utf-8").splitlines()]
+    assert decoded == rows
+
+    reader = csv.DictReader(io.StringIO(b"".join(iter_csv(rows, flush_every=5)).decode("utf-8")))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    parsed = list(reader)
+    assert [row["title"] for row in parsed] == [row["title"] for row in rows]
+    assert parsed[-1]["companies"] == "Acme;Beta"
+
+    table = pq.read_table(io.BytesIO(b"".join(iter_parquet(rows, row_group_size=5))))
+    assert table.num_rows == len(rows)
+    assert table.to_pylist() == rows
+
+
+def test_export_endpoint_streams_the_requested_format(client):
+    response = client.post("/auth/news/export", params={"format": "csv"}, json={"domains": ["finance"]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="prevently-news.csv"' in response.headers["content-disposition"]
+    assert len(list(csv.DictReader(io.StringIO(response.text)))) == 6
+
+
+@pytest.mark.parametrize("body", [
+    {"date_from": "yesterday"},
+    {"domains": 5},
+    {"companies": [1, 2]},
+    {"sentiment_filter": "mixed"},
+])
+def test_export_rejects_bad_filters_before_streaming(client, body):
+    assert client.post("/auth/news/export", json=body).status_code == 400
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.post("/auth/news/export", params={"format": "xlsx"}, json={}).status_code == 400
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.inference import ZeroShotClassifier, load_model
+
+LABELS = ["technology", "finance", "energy"]
+
+
+class WordTokenizer:
+    """Whitespace tokenizer with BERT-style special tokens: [CLS] a [SEP] b [SEP]"""
+
+    model_max_length = 12
+    pad_token_id = 0
+    eos_token_id = 2
+
+    def __init__(self):
+        self.vocab = {}
+
+    def __call__(self, text, add_special_tokens=False):
+        return {"input_ids": [self.vocab.setdefault(word, len(self.vocab) + 10) for word in text.split()]}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 3 if pair else 2
+
+    def build_inputs_with_special_tokens(self, first, second):
+        return [1] + first + [2] + second + [2]
+
+
+class KeywordClassifier(ZeroShotClassifier):
+    """Scores a pair by whether the premise contains the hypothesis label, instead of running a model"""
+
+    def _entailment_logits(self, rows):
+        logits = []
+        for row in rows:
+            premise_end = row.index(2)
+            premise, hypothesis = set(row[1:premise_end]), row[premise_end + 1:-1]
+            logits.append(3.0 if hypothesis[-1] in premise else 0.0)
+        return np.array(logits)
+
+
+@pytest.fixture
+def classifier():
+    model = SimpleNamespace(config=SimpleNamespace(label2id={"contradiction": 0, "neutral": 1, "entailment": 2}))
+    return KeywordClassifier(model, WordTokenizer(), hypothesis_template="This is {}")
+
+
+def test_result_has_the_pipeline_shape_and_order(classifier):
+    result = classifier("banks and finance news", LABELS)
+    assert set(result) == {"sequence", "labels", "scores"}
+    assert result["sequence"] == "banks and finance news"
+    assert result["labels"][0] == "finance"
+    assert sorted(result["labels"]) == sorted(LABELS)
+    assert result["scores"] == sorted(result["scores"], reverse=True)
+    assert sum(result["scores"]) == pytest.approx(1.0)
+
+
+def test_entailment_index_comes_from_the_model_config(classifier):
+    assert classifier.entailment_id == 2
+
+
+def test_only_the_premise_is_truncated(classifier):
+    rows = classifier.encode(" ".join(f"w{i}" for i in range(40)), LABELS)
+    hypotheses = classifier.hypothesis_ids(LABELS)
+    for row, hypothesis in zip(rows, hypotheses):
+        assert len(row) == classifier.max_length
+        assert row[-len(hypothesis) - 1:-1] == hypothesis
+
+
+def test_batch_and_comma_separated_labels(classifier):
+    results = classifier(["energy prices", "new technology"], "technology, finance, energy")
+    assert [result["labels"][0] for result in results] == ["energy", "technology"]
+    assert classifier.hypothesis_ids(LABELS) is classifier.hypothesis_ids(LABELS)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_model("any/model", "sequence", backend="fp16")
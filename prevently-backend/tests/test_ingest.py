@@ -0,0 +1,89 @@
+import time
+
+from app.services.ingest import ArticleIngestor
+
+STORY = ("The central bank raised interest rates by a quarter point on Wednesday, "
+         "citing persistent inflation in services and a tight labour market across the region.")
+
+
+class Pipelines:
+    def __init__(self):
+        self.sentiment_calls = 0
+
+    def sentiment(self, text):
+        self.sentiment_calls += 1
+        return [{"label": "4 stars", "score": 0.8}]
+
+    @staticmethod
+    def ner(text):
+        return [{"word": "Central Bank", "entity_group": "ORG"}]
+
+    @staticmethod
+    def domain(text, labels):
+        return {"labels": ["finance"] + [label for label in labels if label != "finance"]}
+
+
+def raw(url, content, minutes_ago=0):
+    return {
+        "title": "Rates rise",
+        "description": "",
+        "content": content,
+        "source": {"name": "Wire"},
+        "url": url,
+        "publishedAt": int(time.time() * 1000) - minutes_ago * 60 * 1000,
+    }
+
+
+def ingestor(db, pipelines):
+    return ArticleIngestor(db, pipelines.sentiment, pipelines.ner, pipelines.domain)
+
+
+def test_copies_within_a_run_are_linked(db):
+    pipelines = Pipelines()
+    result = ingestor(db, pipelines).ingest([raw("https://a.example/1", STORY), raw("https://b.example/1", STORY + " More.")])
+
+    assert (result["stored"], result["duplicates_linked"]) == (1, 1)
+    [stored] = db.data["news_datastore"].values()
+    assert stored["duplicates"][0]["source_url"] == "https://b.example/1"
+    assert len(stored["minhash"]) == 128
+    assert pipelines.sentiment_calls == 1
+
+
+def test_later_runs_link_to_stored_articles(db):
+    pipelines = Pipelines()
+    ingestor(db, pipelines).ingest([raw("https://a.example/1", STORY, minutes_ago=30)])
+
+    result = ingestor(db, pipelines).ingest([
+        raw("https://a.example/1", STORY, minutes_ago=30),
+        raw("https://c.example/1", STORY + " Markets barely moved."),
+    ])
+
+    assert (result["stored"], result["skipped"], result["duplicates_linked"]) == (0, 1, 1)
+    [stored] = db.data["news_datastore"].values()
+    assert stored["duplicate_count"] == 1
+    assert [link["source_url"] for link in stored["duplicates"]] == ["https://c.example/1"]
+    assert pipelines.sentiment_calls == 1
+
+
+def test_listeners_see_stored_articles(db):
+    class Listener:
+        def __init__(self):
+            self.prepared, self.recorded, self.flushed = [], [], 0
+
+        def prepare(self, articles):
+            self.prepared.extend(articles)
+
+        def record(self, article):
+            self.recorded.append(article["id"])
+
+        def flush(self):
+            self.flushed += 1
+
+    listener = Listener()
+    pipelines = Pipelines()
+    ArticleIngestor(db, pipelines.sentiment, pipelines.ner, pipelines.domain, listeners=[listener]).ingest(
+        [raw("https://a.example/1", STORY)]
+    )
+    assert len(listener.prepared) == 1
+    assert listener.recorded == [listener.prepared[0]["id"]]
+    assert listener.flushed == 1
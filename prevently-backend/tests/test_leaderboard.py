@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+
+from app.services.leaderboard import CompanyLeaderboard, SpaceSaving
+
+
+def article(day: date, companies, sentiment=0.5, domain="finance"):
+    timestamp = int((day - date(1970, 1, 1)).total_seconds() * 1000) + 12 * 60 * 60 * 1000
+    return {"timestamp": timestamp, "companies": companies, "sentiment_numeric": sentiment, "domain": domain}
+
+
+def test_space_saving_counts_exactly_under_capacity():
+    summary = SpaceSaving(capacity=10)
+    for company, sentiment in [("Acme", 1.0), ("Acme", 0.0), ("Beta", -1.0)]:
+        summary.add(company, sentiment)
+    assert summary.stats("Acme") == {
+        "company": "Acme", "mention_count": 2, "error": 0, "avg_sentiment": 0.5, "observed_mentions": 2
+    }
+
+
+def test_space_saving_merge_sums_counts_and_keeps_capacity():
+    left, right = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+    for _ in range(3):
+        left.add("Acme", 1.0)
+    left.add("Beta", 0.0)
+    right.add("Acme", -1.0)
+    right.add("Gamma", 0.0)
+    right.add("Gamma", 0.0)
+
+    merged = left.merge(right)
+    assert set(merged.counters) == {"Acme", "Gamma"}
+    assert merged.stats("Acme")["mention_count"] == 4
+    assert merged.stats("Acme")["avg_sentiment"] == 0.5
+    assert merged.stats("Gamma")["mention_count"] == 3
+
+
+def test_merge_charges_missing_items_the_other_summary_floor():
+    left, right = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+    for company in ["Acme"] * 5 + ["Beta"] * 4:
+        left.add(company, 0.0)
+    for company in ["Gamma"] * 3 + ["Delta"] * 2:
+        right.add(company, 0.0)
+
+    merged = left.merge(right)
+    assert {company: counter[:2] for company, counter in merged.counters.items()} == {"Acme": [7, 2], "Gamma": [7, 4]}
+
+
+def test_window_counts_bound_the_true_counts(db):
+    import random
+
+    rng = random.Random(7)
+    end = date(2024, 3, 10)
+    companies = ["Acme"] * 6 + ["Beta"] * 3 + [f"Small{i}" for i in range(12)]
+    articles, truth = [], {}
+    for offset in range(10):
+        for _ in range(30):
+            company = rng.choice(companies)
+            truth[company] = truth.get(company, 0) + 1
+            articles.append(article(end - timedelta(days=offset), [company]))
+    leaderboard = CompanyLeaderboard(db, capacity=4)
+    leaderboard.rebuild(articles)
+
+    summary = CompanyLeaderboard(db, capacity=4).window(
+        [(end - timedelta(days=offset)).isoformat() for offset in range(9, -1, -1)], chunk_days=3
+    )
+    for company, (count, error, _) in summary.counters.items():
+        assert count - error <= truth[company] <= count
+    assert "Acme" in summary.counters
+
+
+def test_space_saving_list_round_trip():
+    summary = SpaceSaving()
+    summary.add("Acme", 0.25, weight=4)
+    restored = SpaceSaving.from_list(summary.to_list())
+    assert restored.counters == summary.counters
+
+
+def test_window_longer_than_cache_keeps_every_day(db):
+    end = date(2024, 6, 30)
+    writer = CompanyLeaderboard(db)
+    writer.rebuild(article(end - timedelta(days=offset), ["Acme"]) for offset in range(450))
+
+    reader = CompanyLeaderboard(db, max_cached_days=100)
+    top = reader.top(days=450, k=1, end=end.isoformat())
+    assert top[0]["company"] == "Acme"
+    assert top[0]["mention_count"] == 450
+    assert len(reader._days) <= 100
+
+
+def test_rebuild_commits_in_batches_under_the_write_limit(db):
+    start = date(2022, 1, 1)
+    CompanyLeaderboard(db).rebuild(article(start + timedelta(days=offset), ["Acme"]) for offset in range(800))
+    assert len(db.data["company_leaderboard"]) == 800
+    assert db.commits == 3
+
+
+def test_record_adds_to_a_stored_day(db):
+    day = date(2024, 1, 1)
+    first = CompanyLeaderboard(db)
+    first.record(article(day, ["Acme"]))
+    first.flush()
+
+    second = CompanyLeaderboard(db)
+    second.record(article(day, ["Acme"]))
+    second.flush()
+
+    assert CompanyLeaderboard(db).top(days=1, end=day.isoformat(), k=1)[0]["mention_count"] == 2
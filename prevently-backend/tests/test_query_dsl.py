@@ -0,0 +1,30 @@
+import pytest
+
+from app.services.query_dsl import QuerySyntaxError, validate_query
+
+
+@pytest.mark.parametrize("query", [
+    "domain:finance",
+    'company:"Acme Corp" AND sentiment:negative|neutral',
+    "NOT domain:energy OR (date:2024-01-01..2024-03-31 AND company:Tesla)",
+    "domain:technology and not sentiment:positive",
+])
+def test_valid_queries(query):
+    validate_query(query)
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "domain:finance AND",
+    "(domain:finance",
+    "domain:finance)",
+    "colour:red",
+    "sentiment:angry",
+    "date:2024-03-01..2024-01-01",
+    "date:2024-02-30..2024-03-01",
+    'company:""',
+    "domain:fin-ance",
+])
+def test_invalid_queries(query):
+    with pytest.raises(QuerySyntaxError):
+        validate_query(query)
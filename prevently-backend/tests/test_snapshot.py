@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import clients
+from app.main import create_app
+from app.services.snapshot import SnapshotBuilder, SnapshotReader, SnapshotWriter, analytics_key, write_manifest
+
+DAY = 24 * 60 * 60 * 1000
+
+
+def publish(directory, writer, built_at=None):
+    writer.write(str(directory / "snapshot-1.bin"))
+    write_manifest(str(directory), {"version": 1, "file": "snapshot-1.bin", "built_at": built_at or time.time()})
+
+
+def test_list_prefixes_are_valid_json(tmp_path):
+    writer = SnapshotWriter()
+    writer.add("domains", {"domains": [{"id": "finance"}]})
+    writer.add_list("news_latest", "articles", [{"id": f"a{i}", "title": "é"} for i in range(5)])
+    publish(tmp_path, writer)
+
+    reader = SnapshotReader(str(tmp_path), max_age=60)
+    assert json.loads(reader.get("domains")) == {"domains": [{"id": "finance"}]}
+    assert json.loads(reader.get_list("news_latest", 2)) == {"articles": [{"id": "a0", "title": "é"}, {"id": "a1", "title": "é"}]}
+    assert len(json.loads(reader.get_list("news_latest", 50))["articles"]) == 5
+    assert reader.get("missing") is None
+
+
+def test_stale_or_missing_snapshots_are_ignored(tmp_path):
+    assert SnapshotReader(str(tmp_path), max_age=60).get("domains") is None
+
+    writer = SnapshotWriter()
+    writer.add("domains", {"domains": []})
+    publish(tmp_path, writer, built_at=time.time() - 120)
+    assert SnapshotReader(str(tmp_path), max_age=60).get("domains") is None
+
+
+def seed(db, now_ms):
+    db.data["domains"] = {"finance": {"name": "Finance"}}
+    db.data["news_datastore"] = {
+        f"a{i}": {"id": f"a{i}", "title": f"Story {i}", "domain": "finance", "companies": [f"Co{i}"],
+                  "sentiment_numeric": 0.5, "timestamp": now_ms - i * 10 * DAY - 60_000}
+        for i in range(20)
+    }
+
+
+def test_builds_read_only_the_longest_window_after_the_first(db, tmp_path):
+    now_ms = int(time.time() * 1000)
+    seed(db, now_ms)
+    builder = SnapshotBuilder(db, str(tmp_path), windows=(7, 30))
+    builder.build()
+
+    db.reads = 0
+    db.data["news_datastore"]["new"] = {"id": "new", "domain": "finance", "companies": ["Fresh"],
+                                        "sentiment_numeric": 0.1, "timestamp": now_ms}
+    builder.build()
+    window_docs = sum(1 for doc in db.data["news_datastore"].values() if doc["timestamp"] >= now_ms - 30 * DAY)
+    assert db.reads == len(db.data["domains"]) + len(db.data["news_datastore"]) + window_docs
+
+    reader = SnapshotReader(str(tmp_path), max_age=60)
+    companies = json.loads(reader.get("companies"))["companies"]
+    assert "Fresh" in companies and "Co19" in companies
+    analytics = json.loads(reader.get(analytics_key(30, None)))["analytics"]
+    assert sum(day["article_count"] for day in analytics) == window_docs
+
+
+def test_new_leader_starts_from_the_published_company_set(db, tmp_path):
+    now_ms = int(time.time() * 1000)
+    seed(db, now_ms)
+    SnapshotBuilder(db, str(tmp_path), windows=(7,)).build()
+
+    del db.data["news_datastore"]["a19"]
+    SnapshotBuilder(db, str(tmp_path), windows=(7,)).build()
+    assert "Co19" in json.loads(SnapshotReader(str(tmp_path), max_age=60).get("companies"))["companies"]
+
+    SnapshotBuilder(db, str(tmp_path), windows=(7,), companies_rescan_seconds=0).build()
+    assert "Co19" not in json.loads(SnapshotReader(str(tmp_path), max_age=60).get("companies"))["companies"]
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    from app.config import Config
+
+    monkeypatch.setattr(Config, "SNAPSHOT_DIR", str(tmp_path))
+    app = create_app(eager_clients=False, warm_caches=False, refresh_snapshot=False, firestore=db)
+    with TestClient(app) as test_client:
+        yield test_client
+    clients.close()
+
+
+def test_endpoints_fall_back_to_live_data_and_then_serve_the_snapshot(client, db, tmp_path):
+    seed(db, int(time.time() * 1000))
+    live = client.get("/auth/news/latest/3").json()
+    assert [article["id"] for article in live["articles"]] == ["a0", "a1", "a2"]
+
+    SnapshotBuilder(db, str(tmp_path)).build()
+    db.data["news_datastore"].clear()
+    time.sleep(1.1)
+    cached = client.get("/auth/news/latest/3").json()
+    assert cached == live
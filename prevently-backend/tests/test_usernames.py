@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.clients import clients
+from app.main import create_app
+from app.routers import auth
+from app.services.usernames import UsernameService, UsernameTaken
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def client(db):
+    db.data["usernames"] = {"alice": {"email": "alice@example.com", "username": "alice"}}
+    app = create_app(eager_clients=False, warm_caches=False, refresh_snapshot=False, firestore=db,
+                     username_service=UsernameService(db))
+    with TestClient(app) as test_client:
+        yield test_client
+    clients.close()
+
+
+def register(client, username):
+    return client.post("/auth/register", json={"email": f"{username}@example.com", "password": "secret123", "username": username})
+
+
+def test_rebuild_answers_misses_without_reads(db):
+    db.data["usernames"] = {"alice": {"email": "alice@example.com"}}
+    service = UsernameService(db)
+    service.rebuild()
+    reads = db.reads
+
+    assert service.is_available("bob")
+    assert db.reads == reads
+    assert not service.is_available("Alice")
+
+
+def test_refresh_picks_up_names_reserved_by_other_workers(db):
+    service = UsernameService(db, refresh_seconds=0)
+    other = UsernameService(db)
+    service.rebuild()
+
+    other.reserve("bob", "bob@example.com")
+
+    assert not service.is_available("bob")
+    assert "bob" in service._bloom
+
+
+def test_reserve_rejects_existing_names(db):
+    service = UsernameService(db)
+    service.reserve("bob", "bob@example.com")
+
+    with pytest.raises(UsernameTaken):
+        service.reserve("BOB", "other@example.com")
+    assert db.data["usernames"]["bob"]["email"] == "bob@example.com"
+
+
+def test_register_with_taken_username_is_409(client, monkeypatch):
+    monkeypatch.setattr(auth.requests, "post", lambda *args, **kwargs: pytest.fail("signUp must not be called"))
+    assert register(client, "alice").status_code == 409
+
+
+def test_register_releases_username_when_sign_up_fails(client, db, monkeypatch):
+    monkeypatch.setattr(auth.requests, "post", lambda *args, **kwargs: FakeResponse(400, {"error": "EMAIL_EXISTS"}))
+    assert register(client, "bob").status_code == 400
+    assert "bob" not in db.data["usernames"]
+
+
+def test_register_releases_username_when_sign_up_raises(client, db, monkeypatch):
+    def post(*args, **kwargs):
+        raise ConnectionError("unreachable")
+
+    monkeypatch.setattr(auth.requests, "post", post)
+    assert register(client, "bob").status_code == 500
+    assert "bob" not in db.data["usernames"]
+
+
+def test_register_keeps_username_on_success(client, db, monkeypatch):
+    monkeypatch.setattr(auth.requests, "post", lambda *args, **kwargs: FakeResponse(200, {"idToken": "token"}))
+    assert register(client, "bob").status_code == 200
+    assert db.data["usernames"]["bob"]["email"] == "bob@example.com"
+
+
+def test_username_available(client):
+    assert client.get("/auth/username-available", params={"username": "alice"}).json()["available"] is False
+    assert client.get("/auth/username-available", params={"username": "bob"}).json()["available"] is True
+    assert client.get("/auth/username-available", params={"username": "a!"}).status_code == 400